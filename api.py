@@ -0,0 +1,263 @@
+import json
+import math
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+from flask import Flask, jsonify, request
+
+from data import CsvSchema
+from services.calculations import (
+    SuiteAggregate,
+    average_hourly_rate,
+    compute_cost_components,
+    execution_time_savings,
+    roi_over_time,
+)
+from services.compaction import compact_test_cases, compact_testers
+from services.dataset_cache import DatasetCache, content_hash
+from services.ingest import validate_columns
+from services.validation import validate_test_cases, validate_testers
+from services.portfolio import optimise_portfolio
+
+MAX_BATCH_SCENARIOS = 1000
+# Per scenario, every release is a row of the returned ROI curve
+MAX_RELEASES = 1000
+MAX_RUNS_PER_RELEASE = 10_000
+MAX_RELEASES_PER_YEAR = 365.0
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(value: Any) -> Any:
+    # NaN/inf are not valid JSON, report them as null
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _scenario_params(params: Dict[str, Any]) -> Tuple[int, int, float]:
+    try:
+        runs_per_release = float(params.get("runs_per_release", 1))
+        releases = float(params.get("releases", 12))
+        releases_per_year = float(params.get("releases_per_year", 12.0))
+    except (TypeError, ValueError, OverflowError):
+        raise ApiError("runs_per_release, releases and releases_per_year must be numbers")
+    # NaN would pass every comparison below
+    if not all(math.isfinite(v) for v in (runs_per_release, releases, releases_per_year)):
+        raise ApiError("runs_per_release, releases and releases_per_year must be finite numbers")
+    if not runs_per_release.is_integer() or not releases.is_integer():
+        raise ApiError("runs_per_release and releases must be whole numbers")
+    runs_per_release, releases = int(runs_per_release), int(releases)
+    if runs_per_release < 1 or releases < 1 or releases_per_year <= 0:
+        raise ApiError("runs_per_release and releases must be >= 1, releases_per_year > 0")
+    if releases > MAX_RELEASES or runs_per_release > MAX_RUNS_PER_RELEASE or releases_per_year > MAX_RELEASES_PER_YEAR:
+        raise ApiError(
+            f"releases must be <= {MAX_RELEASES}, runs_per_release <= {MAX_RUNS_PER_RELEASE}"
+            f" and releases_per_year <= {MAX_RELEASES_PER_YEAR:g}"
+        )
+    return runs_per_release, releases, releases_per_year
+
+
+def evaluate_scenario(aggregate: SuiteAggregate, rates: Dict[str, float], params: Dict[str, Any]) -> Dict[str, Any]:
+    runs_per_release, releases, releases_per_year = _scenario_params(params)
+    (
+        manual_cost_per_release,
+        automation_initial_cost,
+        automation_run_cost_per_release,
+        maintenance_pct,
+        total_runs,
+    ) = compute_cost_components(aggregate, rates, runs_per_release)
+    roi_df, break_even_release, break_even_cost = roi_over_time(
+        aggregate, rates, runs_per_release, releases, releases_per_year
+    )
+    savings = execution_time_savings(aggregate, runs_per_release=runs_per_release, releases=releases)
+
+    return {
+        "params": {
+            "runs_per_release": runs_per_release,
+            "releases": releases,
+            "releases_per_year": releases_per_year,
+        },
+        "cost_components": {
+            "manual_cost_per_release": _number(manual_cost_per_release),
+            "automation_initial_cost": _number(automation_initial_cost),
+            "automation_run_cost_per_release": _number(automation_run_cost_per_release),
+            "maintenance_pct_per_month": _number(maintenance_pct * 100.0),
+            "total_runs_per_release": total_runs,
+        },
+        "roi": [
+            {k: _number(v) for k, v in row.items()}
+            for row in roi_df.astype({"release": int}).to_dict("records")
+        ],
+        "break_even_release": _number(break_even_release),
+        "break_even_cost": _number(break_even_cost),
+        "execution_time_savings": {k: _number(v) for k, v in savings.items()},
+    }
+
+
+def register_api(
+    server: Flask,
+    dataset_cache: DatasetCache,
+    example_data: Callable[[], pd.DataFrame],
+    tester_example_data: Callable[[], pd.DataFrame],
+):
+    """
+    JSON endpoints on the Dash Flask server:
+
+    POST /api/roi        one parameter set, returns ROI, break-even and savings
+    POST /api/roi/batch  many parameter sets ("scenarios") against one dataset
+    POST /api/portfolio  the candidates to automate within "budget_hours" dev hours
+
+    Test cases and testers are given inline as records ("test_cases",
+    "testers") or by the ID of a cached dataset ("dataset_id",
+    "tester_dataset_id"), both default to the example data. Inline data is
+    cached and its IDs are returned, so follow-up calls can skip re-sending it.
+    """
+    # Built on the first request that falls back to the example data
+    @lru_cache(maxsize=1)
+    def example_aggregate() -> SuiteAggregate:
+        return SuiteAggregate.from_frame(example_data())
+
+    @lru_cache(maxsize=1)
+    def example_rates() -> Dict[str, float]:
+        return average_hourly_rate(tester_example_data())
+
+    def resolve(body: Dict[str, Any], records_key: str, id_key: str, columns, validate, compact) -> Optional[str]:
+        records = body.get(records_key)
+        if records is not None:
+            if not isinstance(records, list) or not records:
+                raise ApiError(f"{records_key} must be a non-empty list of records")
+            try:
+                dataset_id = content_hash(json.dumps(records, sort_keys=True, default=str))
+                if dataset_id not in dataset_cache:
+                    df = pd.DataFrame.from_records(records)
+                    validate_columns(df, columns)
+                    df, report = validate(df)
+                    # Unlike uploads, API callers get their bad rows back rather than having them ignored
+                    if not report.ok:
+                        examples = "; ".join(
+                            f"row {e['row']} {e['column']}={e['value']!r}" for e in report.to_dict()["examples"][:5]
+                        )
+                        raise ApiError(f"Invalid {records_key}: {report.summary()} First: {examples}")
+                    dataset_cache.put(dataset_id, compact(df))
+            except (TypeError, ValueError) as e:
+                raise ApiError(f"Invalid {records_key}: {e}")
+            return dataset_id
+
+        dataset_id = body.get(id_key)
+        if dataset_id is None:
+            return None
+        if not isinstance(dataset_id, str):
+            raise ApiError(f"{id_key} must be a string")
+        try:
+            known = dataset_id in dataset_cache
+        except ValueError:
+            # Not even a valid ID for the spill store, so not one we handed out
+            known = False
+        if not known:
+            raise ApiError(f"Unknown {id_key} {dataset_id!r}, send the records instead", status=404)
+        return dataset_id
+
+    def load(body: Dict[str, Any]) -> Tuple[Dict[str, Any], SuiteAggregate, Dict[str, float]]:
+        dataset_id = resolve(body, "test_cases", "dataset_id", CsvSchema.columns, validate_test_cases,
+                             compact_test_cases)
+        tester_dataset_id = resolve(body, "testers", "tester_dataset_id", CsvSchema.tester_columns, validate_testers,
+                                    compact_testers)
+
+        # Aggregate and rates are derived once per dataset and reused by every call
+        aggregate = (
+            dataset_cache.derived(dataset_id, "suite_aggregate", SuiteAggregate.from_frame)
+            if dataset_id else example_aggregate()
+        )
+        rates = (
+            dataset_cache.derived(tester_dataset_id, "hourly_rates", average_hourly_rate)
+            if tester_dataset_id else example_rates()
+        )
+        if aggregate is None or rates is None:
+            raise ApiError("Dataset was evicted from the cache, send the records again", status=404)
+        ids = {"dataset_id": dataset_id, "tester_dataset_id": tester_dataset_id}
+        return ids, aggregate, rates
+
+    def json_body() -> Dict[str, Any]:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ApiError("Expected a JSON object body")
+        return body
+
+    @server.errorhandler(ApiError)
+    def on_api_error(error: ApiError):
+        return jsonify({"error": str(error)}), error.status
+
+    @server.route("/api/roi", methods=["POST"])
+    def api_roi():
+        body = json_body()
+        ids, aggregate, rates = load(body)
+        try:
+            result = evaluate_scenario(aggregate, rates, body)
+        except ValueError as e:
+            raise ApiError(str(e))
+        return jsonify({**ids, **result})
+
+    @server.route("/api/roi/batch", methods=["POST"])
+    def api_roi_batch():
+        body = json_body()
+        scenarios = body.get("scenarios")
+        if not isinstance(scenarios, list) or not scenarios:
+            raise ApiError("scenarios must be a non-empty list of parameter objects")
+        if len(scenarios) > MAX_BATCH_SCENARIOS:
+            raise ApiError(f"At most {MAX_BATCH_SCENARIOS} scenarios per request")
+        if not all(isinstance(s, dict) for s in scenarios):
+            raise ApiError("every scenario must be a JSON object")
+
+        ids, aggregate, rates = load(body)
+        try:
+            results = [evaluate_scenario(aggregate, rates, params) for params in scenarios]
+        except ValueError as e:
+            raise ApiError(str(e))
+        return jsonify({**ids, "results": results})
+
+    @server.route("/api/portfolio", methods=["POST"])
+    def api_portfolio():
+        body = json_body()
+        ids, _, rates = load(body)
+        runs_per_release, releases, releases_per_year = _scenario_params(body)
+        try:
+            budget_hours = float(body["budget_hours"])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError("budget_hours is required and must be a number")
+
+        # The optimiser works per test case, so it needs the frame, not the aggregate
+        frame = dataset_cache.get(ids["dataset_id"]) if ids["dataset_id"] else example_data()
+        if frame is None:
+            raise ApiError("Dataset was evicted from the cache, send the records again", status=404)
+        try:
+            selection = optimise_portfolio(
+                frame, rates, budget_hours, runs_per_release, releases, releases_per_year,
+                method=body.get("method", "auto"),
+            )
+        except ValueError as e:
+            raise ApiError(str(e))
+
+        return jsonify({
+            **ids,
+            "method": selection.method,
+            "budget_hours": _number(selection.budget_hours),
+            "dev_hours": selection.dev_hours,
+            "roi": _number(selection.roi),
+            "upper_bound": _number(selection.upper_bound),
+            "solve_seconds": selection.solve_seconds,
+            "selected": [
+                {k: _number(v) for k, v in row.items()} for row in selection.selected.to_dict("records")
+            ],
+            "roi_curve": [
+                {k: _number(v) for k, v in row.items()}
+                for row in selection.roi_df.astype({"release": int}).to_dict("records")
+            ],
+            "break_even_release": _number(selection.break_even_release),
+            "break_even_cost": _number(selection.break_even_cost),
+        })
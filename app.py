@@ -1,34 +1,87 @@
-import pandas as pd
-import plotly.express as px
-from dash import Dash, html, dcc
+import os
+import tempfile
+from typing import Optional
 
+from dash import Dash
+
+from api import register_api
 from callbacks import register_callbacks
 from data import ExampleData, CsvSchema, ExampleTesters
 from layout import Layout
+from services import graph_registry
+from services.dataset_cache import DatasetCache
+from services.figure_cache import FigureCache
+from services.jobs import JobManager
+from services.metrics import Metrics, register_metrics_endpoint
+from services.snapshots import SnapshotStore
+from services.spill_store import SpillStore
+from services.store_codec import get_codec
+from services.validation import validate_test_cases, validate_testers
 from upload_parser import UploadParser
 
 
 # -> Dash is the return of the method
 def create_app(
-        title: str = "QAlculator"
+        title: str = "QAlculator",
+        slow_callback_seconds: Optional[float] = None,
+        preload: bool = False,
+        spill_dir: Optional[str] = None,
+        snapshot_db: Optional[str] = None,
+        store_codec: Optional[str] = None,
+        job_db: Optional[str] = None,
 ) -> Dash:
     app = Dash(__name__, suppress_callback_exceptions=True)
 
-    data_frame = ExampleData.data_frame()
-    tester_data_frame = ExampleTesters.tester_data_frame()
-
     app.title = title
 
-    app.layout = Layout(title, data_frame, tester_data_frame).build()
+    app.layout = Layout(title).build()
+
+    parser = UploadParser(CsvSchema.columns, CsvSchema.dtypes, validator=validate_test_cases)
+    test_parser = UploadParser(CsvSchema.tester_columns, CsvSchema.tester_dtypes, table_id="tester-preview-table",
+                               validator=validate_testers)
+
+    # With spill_dir, parsed datasets are shared by every worker pointed at it
+    spill = SpillStore(spill_dir) if spill_dir else None
+    dataset_cache = DatasetCache(spill=spill)
+    figure_cache = FigureCache()
+    # Job state and results live in a SQLite file, so a poll can land on any
+    # worker using the same file: the spill directory's, or one in the temp dir
+    if job_db is None:
+        job_db = os.path.join(spill_dir or tempfile.gettempdir(), "qalculator-jobs.sqlite3")
+    jobs = JobManager(job_db)
+    # Upload history for the ROI Trend tab, a local SQLite file
+    snapshots = SnapshotStore(snapshot_db) if snapshot_db else None
+    # With store_codec ("columns", "arrow" or "parquet") the active-dataset stores
+    # carry the encoded frame as well as its ID, for workers with no shared cache
+    codec = get_codec(store_codec) if store_codec else None
+
+    # Example data and Plotly Express are loaded on first use, which keeps
+    # worker boot fast. preload=True does it now instead, e.g. in a
+    # pre-forking server master so every worker inherits them.
+    if preload:
+        ExampleData.data_frame()
+        ExampleTesters.tester_data_frame()
+        graph_registry.preload()
 
-    parser = UploadParser(CsvSchema())
-    test_parser = UploadParser(CsvSchema.tester_columns)
+    register_callbacks(app, ExampleData.data_frame, ExampleTesters.tester_data_frame, parser, test_parser,
+                       dataset_cache, figure_cache, jobs, snapshots, codec)
+    register_api(app.server, dataset_cache, ExampleData.data_frame, ExampleTesters.tester_data_frame)
 
-    register_callbacks(app, data_frame, tester_data_frame, parser, test_parser)
+    # Callback timings, payload sizes and cache hit rates on /metrics
+    metrics = Metrics(slow_callback_seconds=slow_callback_seconds)
+    metrics.instrument_dash(app)
+    metrics.track_cache("figure", figure_cache.stats)
+    metrics.track_cache("dataset", dataset_cache.stats)
+    metrics.track_cache("dataset_derived", lambda: {
+        key[len("derived_"):]: value for key, value in dataset_cache.stats().items() if key.startswith("derived_")
+    })
+    if spill is not None:
+        metrics.track_cache("dataset_spill", spill.stats)
+    register_metrics_endpoint(app.server, metrics)
 
     return app
 
 
 
 if __name__ == "__main__":
-    create_app().run(debug=True)
+    create_app(snapshot_db="snapshots.sqlite3").run(debug=True)
@@ -0,0 +1,112 @@
+// Clientside callbacks: the ROI tab is redrawn in the browser from the
+// coefficients in roi-coefficients-store, without a server round trip.
+// roiFigure mirrors roi_from_components + roi_over_time_figure in Python.
+
+// Same limits as services/downsampling.py
+const WEBGL_THRESHOLD = 1000;
+const MAX_LINE_POINTS = 2000;
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    qalculator: {
+        roiFigure: function (runs, releases, coefficients) {
+            if (!coefficients) {
+                return window.dash_clientside.no_update;
+            }
+            runs = runs || 1;
+            releases = releases || 12;
+
+            const c = coefficients;
+            const totalRuns = Math.max(1, Math.trunc(c.override_runs + c.default_runs_rows * runs));
+            const manualPerRelease = c.manual_cost_per_run * totalRuns;
+            const runCostPerRelease = c.run_cost_per_run * totalRuns;
+            const initial = c.automation_initial_cost;
+            const maintenancePct = c.maintenance_pct === null ? NaN : c.maintenance_pct;
+            const monthsPerRelease = 12.0 / Math.max(c.releases_per_year, 1.0);
+            const maintenancePerRelease = initial * maintenancePct * monthsPerRelease;
+
+            const release = [], manual = [], automation = [];
+            for (let r = 1; r <= releases; r++) {
+                release.push(r);
+                manual.push(r * manualPerRelease);
+                automation.push(initial + r * (runCostPerRelease + maintenancePerRelease));
+            }
+
+            // First zero crossing of roi, starting from -initial at release 0
+            let breakEven = null;
+            let prevRelease = 0, prevRoi = -initial;
+            for (let i = 0; i < releases; i++) {
+                const roi = manual[i] - automation[i];
+                if (roi === 0) {
+                    breakEven = release[i];
+                } else if (prevRoi === 0) {
+                    breakEven = prevRelease;
+                } else if (prevRoi * roi < 0) {
+                    breakEven = prevRelease + (release[i] - prevRelease) * (-prevRoi / (roi - prevRoi));
+                }
+                if (breakEven !== null) {
+                    break;
+                }
+                prevRelease = release[i];
+                prevRoi = roi;
+            }
+
+            // Both lines are straight, so any subset keeping the ends and the
+            // releases either side of break-even draws the same picture
+            let shown = release.map((_, i) => i);
+            if (releases > MAX_LINE_POINTS) {
+                const step = Math.ceil(releases / MAX_LINE_POINTS);
+                const keep = new Set(shown.filter((i) => i % step === 0).concat([releases - 1]));
+                if (breakEven !== null) {
+                    keep.add(Math.max(0, Math.floor(breakEven) - 1));
+                    keep.add(Math.min(releases - 1, Math.ceil(breakEven) - 1));
+                }
+                shown = Array.from(keep).sort((a, b) => a - b);
+            }
+            const pick = (values) => shown.map((i) => values[i]);
+            const long = shown.length > WEBGL_THRESHOLD;
+            const lineType = long ? "scattergl" : "scatter";
+            const lineMode = long || shown.length < releases ? "lines" : "lines+markers";
+
+            const money = (v) => v.toLocaleString("en-US", {minimumFractionDigits: 2, maximumFractionDigits: 2});
+            const data = [
+                {type: lineType, x: pick(release), y: pick(manual), mode: lineMode, name: "Manual"},
+                {type: lineType, x: pick(release), y: pick(automation), mode: lineMode, name: "Automation"},
+            ];
+            const annotations = [];
+            if (breakEven !== null) {
+                const breakEvenCost = manualPerRelease * breakEven;
+                data.push({
+                    type: "scatter", x: [breakEven], y: [breakEvenCost], mode: "markers",
+                    marker: {symbol: "x", size: 12, color: "red"}, name: "Break-even",
+                });
+                annotations.push(
+                    {x: breakEven, y: breakEvenCost, showarrow: true, arrowhead: 2,
+                     text: `Break-even: Release ${breakEven.toFixed(2)} (R${money(breakEvenCost)})`},
+                    {x: releases, y: manual[releases - 1], showarrow: false, yanchor: "bottom",
+                     text: `Manual total: R${money(manual[releases - 1])}`},
+                    {x: releases, y: automation[releases - 1], showarrow: false, yanchor: "top",
+                     text: `Automation total: R${money(automation[releases - 1])}`},
+                );
+            }
+            return {
+                data: data,
+                layout: {
+                    title: {text: "ROI Over Time"},
+                    xaxis: {title: {text: "Release"}},
+                    yaxis: {title: {text: "Cumulative Cost (Rands)"}, tickprefix: "R"},
+                    margin: {t: 60},
+                    annotations: annotations,
+                },
+            };
+        },
+
+        // Passes runs/releases changes on to the server only when the open tab
+        // is computed there from them.
+        graphParams: function (runs, releases, activeTab) {
+            if (!activeTab || !activeTab.uses_inputs) {
+                return window.dash_clientside.no_update;
+            }
+            return [runs, releases];
+        },
+    },
+});
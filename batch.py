@@ -0,0 +1,185 @@
+"""
+Headless batch mode: computes the ROI report for many test-case suites at once.
+
+    python batch.py suites/ --testers testers.csv --output report.json
+    python batch.py "suites/*.csv" other.xlsx --testers testers.csv --output report.parquet
+
+Only pandas/NumPy and the services are imported, never Dash, so startup stays fast.
+"""
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from data import CsvSchema
+from services.calculations import (
+    SuiteAggregate,
+    RATE_WEIGHTINGS,
+    average_hourly_rate,
+    compute_cost_components,
+    execution_time_savings,
+    roi_over_time,
+)
+from services.ingest import TABLE_EXTENSIONS, aggregate_csv, read_csv_header, read_table, validate_columns
+from services.validation import ValidationReport, validate_test_cases, validate_testers
+
+SUITE_EXTENSIONS = TABLE_EXTENSIONS
+REPORT_FORMATS = {".json": "json", ".csv": "csv", ".parquet": "parquet"}
+
+
+def find_suites(patterns: Iterable[str]) -> List[Path]:
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = Path(pattern).iterdir()
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+        paths.update(p for p in candidates if p.is_file() and p.suffix.lower() in SUITE_EXTENSIONS)
+    return sorted(paths)
+
+
+def load_aggregate(path: Path) -> Tuple[SuiteAggregate, ValidationReport]:
+    buffer = path.read_bytes()
+    if path.suffix.lower() == ".csv":
+        # CSVs are folded chunk by chunk, so huge suites never sit in memory whole
+        validate_columns(read_csv_header(buffer), CsvSchema.columns)
+        _, aggregate, report = aggregate_csv(buffer, CsvSchema.columns, CsvSchema.dtypes, validator=validate_test_cases)
+        return aggregate, report
+    df = read_table(buffer, path.name, CsvSchema.dtypes, CsvSchema.columns)
+    validate_columns(df, CsvSchema.columns)
+    df, report = validate_test_cases(df)
+    return SuiteAggregate.from_frame(df), report
+
+
+def evaluate_suite(
+    path: Path,
+    rates: Dict[str, float],
+    runs_per_release: int,
+    releases: int,
+    releases_per_year: float,
+) -> Dict[str, object]:
+    row = {"suite": path.stem, "path": str(path)}
+    try:
+        aggregate, validation = load_aggregate(path)
+        (
+            manual_cost_per_release,
+            automation_initial_cost,
+            automation_run_cost_per_release,
+            maintenance_pct,
+            total_runs,
+        ) = compute_cost_components(aggregate, rates, runs_per_release)
+        roi_df, break_even_release, break_even_cost = roi_over_time(
+            aggregate, rates, runs_per_release, releases, releases_per_year
+        )
+        savings = execution_time_savings(aggregate, runs_per_release=runs_per_release, releases=releases)
+    except Exception as e:
+        row["error"] = str(e)
+        return row
+
+    row.update({
+        "test_cases": aggregate.row_count,
+        # Their invalid values were ignored like blanks, as in the app
+        "invalid_rows": validation.invalid_rows,
+        "validation": None if validation.ok else validation.summary(),
+        "automation_candidates": aggregate.candidate_count,
+        "manual_cost_per_release": manual_cost_per_release,
+        "automation_initial_cost": automation_initial_cost,
+        "automation_run_cost_per_release": automation_run_cost_per_release,
+        "maintenance_pct_per_month": maintenance_pct * 100.0,
+        "total_runs_per_release": total_runs,
+        "break_even_release": break_even_release,
+        "break_even_cost": break_even_cost,
+        "manual_cost_total": float(roi_df["manual_cost"].iloc[-1]),
+        "automation_cost_total": float(roi_df["automation_cost"].iloc[-1]),
+        "roi_total": float(roi_df["roi"].iloc[-1]),
+        "manual_hours": savings["manual_hours"],
+        "automation_hours": savings["automation_hours"],
+        "savings_hours": savings["savings_hours"],
+        "savings_percentage": savings["savings_percentage"],
+        "error": None,
+    })
+    return row
+
+
+def build_report(
+    paths: List[Path],
+    rates: Dict[str, float],
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    n = len(paths)
+    args = ([rates] * n, [runs_per_release] * n, [releases] * n, [releases_per_year] * n)
+    if workers == 1 or n < 2:
+        rows = list(map(evaluate_suite, paths, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(evaluate_suite, paths, *args))
+    return pd.DataFrame(rows)
+
+
+def write_report(report: pd.DataFrame, output: Path) -> None:
+    report_format = REPORT_FORMATS.get(output.suffix.lower())
+    if report_format == "json":
+        report.to_json(output, orient="records", indent=2)
+    elif report_format == "csv":
+        report.to_csv(output, index=False)
+    elif report_format == "parquet":
+        report.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Unsupported report format {output.suffix!r}, use one of {sorted(REPORT_FORMATS)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute the QAlculator ROI report for many suites.")
+    parser.add_argument("suites", nargs="+", help="Suite files, directories or glob patterns (.csv/.xlsx/.parquet/.arrow)")
+    parser.add_argument("--testers", required=True, help="Tester pool file (.csv/.xlsx/.parquet/.arrow)")
+    parser.add_argument("--output", required=True, help="Report file, .json, .csv or .parquet")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per release (default 1)")
+    parser.add_argument("--releases", type=int, default=12, help="Releases to project (default 12)")
+    parser.add_argument("--releases-per-year", type=float, default=12.0, help="Release cadence (default 12)")
+    parser.add_argument("--rate-weighting", choices=RATE_WEIGHTINGS, default="headcount",
+                        help="Average testers' hourly rates per head, or divide each role's salaries by its hours")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    if output.suffix.lower() not in REPORT_FORMATS:
+        parser.error(f"--output must end in one of {sorted(REPORT_FORMATS)}")
+
+    paths = find_suites(args.suites)
+    if not paths:
+        parser.error("no suite files matched")
+
+    testers_path = Path(args.testers)
+    testers_df = read_table(
+        testers_path.read_bytes(), testers_path.name, CsvSchema.tester_dtypes, CsvSchema.tester_columns
+    )
+    validate_columns(testers_df, CsvSchema.tester_columns)
+    testers_df, tester_report = validate_testers(testers_df)
+    if not tester_report.ok:
+        print(f"{testers_path}: {tester_report.summary()}", file=sys.stderr)
+    rates = average_hourly_rate(testers_df, args.rate_weighting)
+
+    report = build_report(paths, rates, args.runs, args.releases, args.releases_per_year, args.workers)
+    try:
+        write_report(report, output)
+    except ImportError as e:
+        # Parquet needs the optional pyarrow (or fastparquet) dependency
+        print(f"Could not write {output}: {e}", file=sys.stderr)
+        return 2
+
+    failed = report["error"].notna().sum() if "error" in report else 0
+    invalid = (report["invalid_rows"] > 0).sum() if "invalid_rows" in report else 0
+    print(f"Wrote {len(report)} suites to {output} ({failed} failed, {invalid} with invalid rows)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+"""
+Reproducible benchmarks for the calculations, graph builders and upload parsing.
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --sizes 1000 100000 --compare before.json --output after.json
+
+Each benchmark runs --repeat times per suite size on synthetic data (see
+benchmarks.synthetic) and is reported as min/median/mean seconds in JSON,
+together with the commit and library versions, so two runs can be compared.
+"""
+import argparse
+import atexit
+import datetime as dt
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from benchmarks import startup
+from benchmarks.synthetic import SIZES, synthetic_test_cases, synthetic_testers, to_bytes, upload_contents, with_errors
+from data import CsvSchema
+from services import graph_registry
+from services.calculations import SuiteAggregate, average_hourly_rate, compute_cost_components, roi_over_time
+from services.compaction import compact_test_cases
+from services.ingest import read_table
+from services.portfolio import optimise_portfolio
+from services.validation import validate_test_cases
+from upload_parser import UploadParser
+
+# Writing and reading .xlsx is orders of magnitude slower than CSV,
+# the 1M-row workbook would dominate the whole run.
+XLSX_MAX_ROWS = 100_000
+TESTER_ROWS = 50
+
+
+@dataclass
+class Fixtures:
+    rows: int
+    seed: int = 0
+    xlsx_max_rows: int = XLSX_MAX_ROWS
+
+    @cached_property
+    def suite(self) -> pd.DataFrame:
+        # The frame as the app holds it after parsing an upload
+        return self.parser.read_contents(self.csv_contents, "suite.csv")
+
+    @cached_property
+    def testers(self) -> pd.DataFrame:
+        return synthetic_testers(TESTER_ROWS, self.seed)
+
+    @cached_property
+    def rates(self) -> Dict[str, float]:
+        return average_hourly_rate(self.testers)
+
+    @cached_property
+    def parser(self) -> UploadParser:
+        return UploadParser(CsvSchema.columns, CsvSchema.dtypes, validator=validate_test_cases)
+
+    @cached_property
+    def test_cases(self) -> pd.DataFrame:
+        return synthetic_test_cases(self.rows, self.seed)
+
+    @cached_property
+    def csv_contents(self) -> str:
+        return upload_contents(self.test_cases, "csv")
+
+    @cached_property
+    def xlsx_contents(self) -> Optional[str]:
+        if self.rows > self.xlsx_max_rows:
+            return None
+        return upload_contents(self.test_cases, "xlsx")
+
+    @cached_property
+    def parquet_contents(self) -> str:
+        return upload_contents(self.test_cases, "parquet")
+
+    @cached_property
+    def arrow_contents(self) -> str:
+        return upload_contents(self.test_cases, "arrow")
+
+
+@dataclass
+class Result:
+    name: str
+    rows: int
+    timings: List[float] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+    skipped: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {"name": self.name, "rows": self.rows, "repeat": len(self.timings)}
+        if self.skipped:
+            result["skipped"] = self.skipped
+        if self.timings:
+            result.update({
+                "min_s": min(self.timings),
+                "median_s": statistics.median(self.timings),
+                "mean_s": statistics.fmean(self.timings),
+                "stdev_s": statistics.stdev(self.timings) if len(self.timings) > 1 else 0.0,
+            })
+        result.update(self.extra)
+        return result
+
+
+# A benchmark takes the fixtures and returns the zero-argument call to time,
+# or a string explaining why it is skipped at this size. Fixtures are built
+# lazily, so setups pull what they need before returning and stay untimed.
+BENCHMARKS: List[Tuple[str, Callable[[Fixtures], Any]]] = []
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[Fixtures], Any]):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+@benchmark("calculations.compute_cost_components")
+def _compute_cost_components(fx: Fixtures):
+    suite, rates = fx.suite, fx.rates
+    return lambda: compute_cost_components(suite, rates, 1)
+
+
+@benchmark("calculations.roi_over_time")
+def _roi_over_time(fx: Fixtures):
+    suite, rates = fx.suite, fx.rates
+    return lambda: roi_over_time(suite, rates, 1, 12, 12.0)
+
+
+@benchmark("graph.manual_automation_comparison")
+def _comparison_graph(fx: Fixtures):
+    suite = fx.suite
+    return lambda: graph_registry.manual_automation_comparison_graph(suite)
+
+
+@benchmark("graph.execution_savings_time")
+def _savings_graph(fx: Fixtures):
+    suite = fx.suite
+    return lambda: graph_registry.execution_savings_time_graph(suite, 1, 12)
+
+
+@benchmark("graph.roi_over_time")
+def _roi_graph(fx: Fixtures):
+    suite, testers = fx.suite, fx.testers
+    return lambda: graph_registry.roi_over_time_graph(suite, testers, 1, 12, 12.0)
+
+
+@benchmark("graph.roi_over_time.long_horizon")
+def _roi_graph_long_horizon(fx: Fixtures):
+    # Ten years of daily releases, reported with the size of the figure sent to the browser
+    suite, testers = fx.suite, fx.testers
+
+    def build():
+        figure = graph_registry.roi_over_time_graph(suite, testers, 1, 3650, 365.0)
+        return {"figure_bytes": len(figure.to_json())}
+    return build
+
+
+@benchmark("graph.roi_scenario_heatmap")
+def _heatmap_graph(fx: Fixtures):
+    suite, testers = fx.suite, fx.testers
+    return lambda: graph_registry.roi_scenario_heatmap_graph(suite, testers)
+
+
+@benchmark("graph.roi_fan_chart")
+def _fan_chart_graph(fx: Fixtures):
+    suite, testers = fx.suite, fx.testers
+    return lambda: graph_registry.roi_fan_chart_graph(suite, testers, 1, 12, 12.0)
+
+
+@benchmark("graph.roi_ranking")
+def _ranking_graph(fx: Fixtures):
+    suite, testers = fx.suite, fx.testers
+    return lambda: graph_registry.roi_ranking_graph(suite, testers, 1, 12, 12.0)
+
+
+@benchmark("optimiser.portfolio")
+def _portfolio(fx: Fixtures):
+    # A budget of about a tenth of the suite's development hours
+    suite, rates = fx.suite, fx.rates
+    budget_hours = float(suite["dev_time_hours"].sum()) / 10
+    return lambda: {"method": optimise_portfolio(suite, rates, budget_hours).method}
+
+
+# Peak memory of one parse, measured in a fresh interpreter so every
+# allocator (Python, NumPy, Arrow's pool) is counted. The high-water mark is
+# reset after the imports, which would otherwise hide the parse's peak.
+_PARSE_MEMORY_PROBE = """
+import sys
+from data import CsvSchema
+from upload_parser import UploadParser
+from services.ingest import read_table
+from services.validation import validate_test_cases
+
+def rss_kib(field):
+    with open("/proc/self/status") as status:
+        return int(next(line for line in status if line.startswith(field)).split()[1])
+
+contents = open(sys.argv[1]).read()
+parser = UploadParser(CsvSchema.columns, CsvSchema.dtypes, validator=validate_test_cases)
+# Reader imports are loaded first, they aren't parse memory
+read_table(open(sys.argv[2], "rb").read(), sys.argv[3], CsvSchema.dtypes)
+with open("/proc/self/clear_refs", "w") as clear_refs:
+    clear_refs.write("5")
+before = rss_kib("VmRSS:")
+parser.read_contents(contents, sys.argv[3])
+print(rss_kib("VmHWM:") - before)
+"""
+
+
+def parse_peak_memory(contents: str, file_format: str) -> Optional[int]:
+    # Linux only: needs /proc to reset and read the peak resident set size
+    if not Path("/proc/self/clear_refs").exists():
+        return None
+    with tempfile.TemporaryDirectory(prefix="qalculator-bench-") as directory:
+        contents_path = Path(directory, "contents.txt")
+        contents_path.write_text(contents)
+        warm_up_path = Path(directory, f"warm_up.{file_format}")
+        warm_up_path.write_bytes(to_bytes(synthetic_test_cases(10), file_format))
+        try:
+            out = subprocess.run(
+                [sys.executable, "-c", _PARSE_MEMORY_PROBE, str(contents_path), str(warm_up_path),
+                 f"suite.{file_format}"],
+                capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent.parent,
+            )
+        except subprocess.CalledProcessError:
+            return None
+    return int(out.stdout.strip().splitlines()[-1]) * 1024
+
+
+def _parse_benchmark(fx: Fixtures, file_format: str):
+    contents = getattr(fx, f"{file_format}_contents")
+    if contents is None:
+        return f"{file_format} is only generated up to {fx.xlsx_max_rows} rows"
+    parser, filename = fx.parser, f"suite.{file_format}"
+    memory = {"upload_bytes": len(contents), "peak_memory_bytes": parse_peak_memory(contents, file_format)}
+
+    def parse():
+        parser.parse_contents(contents, filename, 0)
+        return memory
+    return parse
+
+
+for _file_format in ("csv", "xlsx", "parquet", "arrow"):
+    benchmark(f"upload.parse_contents.{_file_format}")(
+        lambda fx, file_format=_file_format: _parse_benchmark(fx, file_format)
+    )
+
+
+def _validate_benchmark(fx: Fixtures, fraction: float):
+    # The frame as read_table returns it, before validation coerces it
+    df = fx.test_cases if not fraction else with_errors(fx.test_cases, fraction, fx.seed)
+    raw = read_table(to_bytes(df, "csv"), "suite.csv", CsvSchema.dtypes)
+
+    def validate():
+        _, report = validate_test_cases(raw)
+        return {"invalid_rows": report.invalid_rows}
+    return validate
+
+
+benchmark("upload.validate")(lambda fx: _validate_benchmark(fx, 0.0))
+benchmark("upload.validate.with_errors")(lambda fx: _validate_benchmark(fx, 0.01))
+
+
+@benchmark("store.records_round_trip")
+def _store_round_trip(fx: Fixtures):
+    # What a dcc.Store holding df.to_dict("records") costs: serialise on the
+    # way out, parse and rebuild the frame on the way back in.
+    suite = fx.suite
+
+    def round_trip():
+        payload = to_json_plotly(suite.to_dict("records"))
+        pd.DataFrame(json.loads(payload))
+        return {"payload_bytes": len(payload)}
+    return round_trip
+
+
+def _store_codec_benchmark(fx: Fixtures, codec_name: str):
+    # The same round trip with create_app(store_codec=...): the compacted
+    # frame the upload job caches, encoded into the store value and decoded
+    # by a worker that doesn't have it cached
+    from services.store_codec import decode_store, get_codec, inline_store
+
+    try:
+        codec = get_codec(codec_name)
+    except ImportError as e:
+        return f"needs pyarrow ({e})"
+    frame = compact_test_cases(fx.suite)
+
+    def round_trip():
+        payload = to_json_plotly(inline_store(frame, codec))
+        decode_store(json.loads(payload))
+        return {"payload_bytes": len(payload)}
+    return round_trip
+
+
+for _codec_name in ("columns", "arrow", "parquet"):
+    benchmark(f"store.codec_round_trip.{_codec_name}")(
+        lambda fx, codec_name=_codec_name: _store_codec_benchmark(fx, codec_name)
+    )
+
+
+@benchmark("store.spill_read")
+def _spill_read(fx: Fixtures):
+    # What another worker pays for a dataset it didn't parse: memory-map the
+    # spilled Arrow file and wrap it as a frame
+    try:
+        from services.spill_store import SpillStore
+        store = SpillStore(tempfile.mkdtemp(prefix="qalculator-bench-"))
+    except ImportError as e:
+        return f"needs pyarrow ({e})"
+    atexit.register(shutil.rmtree, store.directory, ignore_errors=True)
+    store.put("suite", fx.suite)
+
+    def read():
+        store.get("suite")
+        return {"file_bytes": store.path("suite").stat().st_size}
+    return read
+
+
+TREND_SNAPSHOTS = 5_000
+TREND_SUITES = 10
+
+
+@lru_cache(maxsize=1)
+def _snapshot_store(seed: int):
+    # Ten suites with 500 snapshots each, a day apart. Built once and shared
+    # by every suite size, trend queries never touch the test-case rows.
+    from services.snapshots import SnapshotStore
+
+    store = SnapshotStore(Path(tempfile.mkdtemp(prefix="qalculator-bench-"), "snapshots.sqlite3"))
+    atexit.register(shutil.rmtree, store.path.parent, ignore_errors=True)
+    aggregate = SuiteAggregate.from_frame(synthetic_test_cases(1_000, seed))
+    rates = average_hourly_rate(synthetic_testers(TESTER_ROWS, seed))
+    for i in range(TREND_SNAPSHOTS):
+        store.save(f"suite-{i % TREND_SUITES}", aggregate, rates, taken_at=1_700_000_000 + i * 86_400)
+    return store
+
+
+@benchmark("snapshots.trend_query")
+def _trend_query(fx: Fixtures):
+    store = _snapshot_store(fx.seed)
+    return lambda: {"snapshots": TREND_SNAPSHOTS, "returned": len(store.trend("suite-3", limit=50))}
+
+
+def run_benchmark(name: str, setup: Callable[[Fixtures], Any], fx: Fixtures, repeat: int) -> Result:
+    result = Result(name, fx.rows)
+    call = setup(fx)
+    if isinstance(call, str):
+        result.skipped = call
+        return result
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extra = call()
+        result.timings.append(time.perf_counter() - start)
+        if isinstance(extra, dict):
+            result.extra.update(extra)
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def run(sizes, repeat: int = 3, only: Optional[str] = None, seed: int = 0,
+        xlsx_max_rows: int = XLSX_MAX_ROWS) -> Dict[str, Any]:
+    results = []
+    # Cold start doesn't depend on the suite size, it is measured once
+    for target in startup.TARGETS:
+        name = f"startup.{target}"
+        if only and only not in name:
+            continue
+        results.append(startup.measure(target, repeat))
+        print(f"{name:<40} {'-':>9} rows  {results[-1]['median_s']:.4f}s", file=sys.stderr)
+
+    for rows in sizes:
+        fx = Fixtures(rows, seed, xlsx_max_rows)
+        for name, setup in BENCHMARKS:
+            if only and only not in name:
+                continue
+            result = run_benchmark(name, setup, fx, repeat)
+            results.append(result.to_dict())
+            timing = f"{result.to_dict()['median_s']:.4f}s" if result.timings else f"skipped ({result.skipped})"
+            print(f"{name:<40} {rows:>9} rows  {timing}", file=sys.stderr)
+    return {"environment": environment(), "repeat": repeat, "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    # Matches benchmarks by (name, rows) and reports current/baseline median ratios
+    before = {(r["name"], r["rows"]): r for r in baseline["results"] if "median_s" in r}
+    rows = []
+    for r in current["results"]:
+        old = before.get((r["name"], r["rows"]))
+        if old is None or "median_s" not in r:
+            continue
+        ratio = r["median_s"] / old["median_s"] if old["median_s"] else float("inf")
+        rows.append({
+            "name": r["name"],
+            "rows": r["rows"],
+            "baseline_s": old["median_s"],
+            "current_s": r["median_s"],
+            "ratio": ratio,
+            "regression": ratio > threshold,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the QAlculator benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Suite sizes in rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default 3)")
+    parser.add_argument("--only", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data (default 0)")
+    parser.add_argument("--xlsx-max-rows", type=int, default=XLSX_MAX_ROWS, help="Largest suite parsed as .xlsx")
+    parser.add_argument("--output", default=None, help="JSON results file (default: stdout)")
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Median ratio above which --compare flags a regression (default 1.25)")
+    parser.add_argument("--import-budget", type=float, default=startup.IMPORT_BUDGET_SECONDS,
+                        help=f"Allowed median cold start in seconds (default {startup.IMPORT_BUDGET_SECONDS})")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat, args.only, args.seed, args.xlsx_max_rows)
+
+    report["startup_problems"] = startup.over_budget(report["results"], args.import_budget)
+    for problem in report["startup_problems"]:
+        print(problem, file=sys.stderr)
+    regressions = len(report["startup_problems"])
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["comparison"] = compare(report, baseline, args.threshold)
+        for row in report["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<40} {row['rows']:>9} rows  x{row['ratio']:.2f}{flag}", file=sys.stderr)
+        regressions += sum(row["regression"] for row in report["comparison"])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
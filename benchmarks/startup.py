@@ -0,0 +1,92 @@
+"""
+Cold-start times: each target is imported in a fresh interpreter, so nothing
+is shared with earlier runs or with the benchmark process itself.
+
+    python -m benchmarks.startup --budget 2.0
+
+Exits with 1 when a target's median goes over the budget, or when it loads a
+module it should leave for later (see TARGETS).
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+IMPORT_BUDGET_SECONDS = 2.5
+
+# name -> (statement timed after the import, modules that must not be loaded yet)
+TARGETS = {
+    "app": ("app.create_app()", ("plotly.express",)),
+    "batch": ("", ("dash", "plotly")),
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{statement}
+ready = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "ready_s": ready - start,
+    "loaded": [m for m in {forbidden!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(module: str, statement: str = "", forbidden: Sequence[str] = ()) -> Dict[str, Any]:
+    code = _PROBE.format(module=module, statement=statement or "pass", forbidden=tuple(forbidden))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(name: str, repeat: int = 3) -> Dict[str, Any]:
+    statement, forbidden = TARGETS[name]
+    runs = [probe(name, statement, forbidden) for _ in range(repeat)]
+    ready = [r["ready_s"] for r in runs]
+    return {
+        "name": f"startup.{name}",
+        "rows": 0,
+        "repeat": repeat,
+        "min_s": min(ready),
+        "median_s": statistics.median(ready),
+        "mean_s": statistics.fmean(ready),
+        "stdev_s": statistics.stdev(ready) if repeat > 1 else 0.0,
+        "import_median_s": statistics.median(r["import_s"] for r in runs),
+        "eager_modules": sorted({m for r in runs for m in r["loaded"]}),
+    }
+
+
+def over_budget(results: List[Dict[str, Any]], budget: float) -> List[str]:
+    problems = []
+    for r in results:
+        if not r["name"].startswith("startup."):
+            continue
+        if r["median_s"] > budget:
+            problems.append(f"{r['name']} took {r['median_s']:.3f}s, budget is {budget:.3f}s")
+        if r["eager_modules"]:
+            problems.append(f"{r['name']} loaded {', '.join(r['eager_modules'])} at startup")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure QAlculator cold-start time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target (default 3)")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_SECONDS,
+                        help=f"Allowed median startup in seconds (default {IMPORT_BUDGET_SECONDS})")
+    args = parser.parse_args(argv)
+
+    results = [measure(name, args.repeat) for name in TARGETS]
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    problems = over_budget(results, args.budget)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Synthetic, CsvSchema-conformant test-case suites and tester pools.
+
+    python -m benchmarks.synthetic --rows 100000 --output suite.csv
+    python -m benchmarks.synthetic --rows 50 --testers --output testers.xlsx
+
+Data is generated from a seeded NumPy Generator, so a given (rows, seed) pair
+always produces the same frame.
+"""
+import argparse
+import base64
+import io
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data import CsvSchema
+
+SIZES = (1_000, 100_000, 1_000_000)
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+RISKS = np.array(["High", "Medium", "Low"])
+# Mixes the spellings real suites use, including blanks
+CANDIDATE_LABELS = np.array(["Yes", "No", "yes", "Auto", "NO", ""], dtype=object)
+CANDIDATE_WEIGHTS = (0.45, 0.30, 0.08, 0.07, 0.05, 0.05)
+ROLES = np.array(["manual", "automation"])
+
+
+def synthetic_test_cases(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, rows + 1)
+    width = max(6, len(str(rows)))
+
+    # About one case in ten carries its own runs_per_release_override
+    override = rng.integers(1, 6, size=rows).astype("float64")
+    override[rng.random(rows) >= 0.1] = np.nan
+
+    df = pd.DataFrame({
+        "test_id": [f"TC-{i:0{width}d}" for i in ids],
+        "title": [f"Synthetic case {i}" for i in ids],
+        "risk": RISKS[rng.integers(0, len(RISKS), size=rows)],
+        "manual_time_min": rng.integers(1, 45, size=rows).astype("float64"),
+        "candidate_for_automation": rng.choice(CANDIDATE_LABELS, size=rows, p=CANDIDATE_WEIGHTS),
+        "dev_time_hours": np.round(rng.gamma(2.0, 1.5, size=rows), 2),
+        "exec_time_sec": rng.integers(2, 180, size=rows).astype("float64"),
+        "maintenance_pct_per_month": np.round(rng.uniform(0.0, 10.0, size=rows), 1),
+        "runs_per_release_override": override,
+    })
+    return df[list(CsvSchema.columns)]
+
+
+def with_errors(df: pd.DataFrame, fraction: float = 0.01, seed: int = 0) -> pd.DataFrame:
+    """
+    A copy of a synthetic suite with the mistakes real exports contain in
+    about `fraction` of its rows: text and negatives in numeric columns,
+    maintenance over 100% and unknown candidate labels.
+    """
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    rows = len(df)
+
+    def pick():
+        return rng.random(rows) < fraction / 4
+
+    # A text column throughout, as a spreadsheet export with a stray note gives
+    manual = df["manual_time_min"].map("{:g}".format)
+    manual[pick()] = "TBD"
+    df["manual_time_min"] = manual
+    df.loc[pick(), "dev_time_hours"] = -1.0
+    df.loc[pick(), "maintenance_pct_per_month"] = 150.0
+    df.loc[pick(), "candidate_for_automation"] = "maybe"
+    return df
+
+
+def synthetic_testers(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    roles = ROLES[rng.integers(0, len(ROLES), size=rows)]
+    # Keep at least one tester per role, so both hourly rates exist
+    roles[: min(rows, len(ROLES))] = ROLES[: min(rows, len(ROLES))]
+
+    df = pd.DataFrame({
+        "name": [f"Tester {i}" for i in range(1, rows + 1)],
+        "role": roles,
+        "monthly_salary": np.round(rng.uniform(18_000, 45_000, size=rows), -2),
+        "hours_per_month": rng.choice([120.0, 140.0, 160.0, 168.0], size=rows),
+    })
+    return df[list(CsvSchema.tester_columns)]
+
+
+def to_bytes(df: pd.DataFrame, file_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        df.to_csv(buffer, index=False)
+    elif file_format == "xlsx":
+        df.to_excel(buffer, index=False)
+    elif file_format == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif file_format == "arrow":
+        df.to_feather(buffer)
+    else:
+        raise ValueError(f"Unsupported format {file_format!r}, use one of {tuple(MIME_TYPES)}")
+    return buffer.getvalue()
+
+
+def upload_contents(df: pd.DataFrame, file_format: str) -> str:
+    # Same data URL shape that dcc.Upload hands to the callbacks
+    return f"data:{MIME_TYPES[file_format]};base64," + base64.b64encode(to_bytes(df, file_format)).decode("ascii")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic QAlculator suite or tester pool.")
+    parser.add_argument("--rows", type=int, default=SIZES[0], help="Number of rows (default 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0)")
+    parser.add_argument("--testers", action="store_true", help="Write a tester pool instead of test cases")
+    parser.add_argument("--output", required=True, help="Output file, .csv, .xlsx, .parquet or .arrow")
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    file_format = output.suffix.lower().lstrip(".")
+    if file_format not in MIME_TYPES:
+        parser.error("--output must end in .csv, .xlsx, .parquet or .arrow")
+
+    generate = synthetic_testers if args.testers else synthetic_test_cases
+    output.write_bytes(to_bytes(generate(args.rows, args.seed), file_format))
+    print(f"Wrote {args.rows} rows to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
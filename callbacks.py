@@ -1,15 +1,153 @@
-from dash import dcc, Input, Output, dash_table, html, State
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional
+
+from dash import ClientsideFunction, dcc, Input, Output, html, State, no_update
 import pandas as pd
 
+from services.calculations import SuiteAggregate, average_hourly_rate, roi_coefficients
+from services.compaction import compact_test_cases, compact_testers
+from services.dataset_cache import DatasetCache, content_hash
+from services.figure_cache import FigureCache
+from services.jobs import JobCancelled, JobManager
+from services.metrics import phase
 from services.graph_registry import (
     execution_savings_time_graph,
     manual_automation_comparison_graph,
-    roi_over_time_graph,
+    roi_fan_chart_graph,
+    roi_ranking_graph,
+    roi_scenario_heatmap_graph,
+    roi_trend_graph,
 )
-from upload_parser import UploadParser
+from services.snapshots import SnapshotStore
+from services.store_codec import StoreCodec, decode_store, inline_dataset_id, inline_store, store_dataset_id
+from services.table_pages import table_page
+from upload_parser import UploadParser, preview_table
+
+logger = logging.getLogger("qalculator.snapshots")
+
+# Uploads shown on the ROI Trend tab, e.g. the last 50 sprints
+TREND_SNAPSHOTS = 50
+# Uploads remembered by hash when their frame is cached under another ID
+UPLOAD_IDS = 256
+
+
+def register_callbacks(app, example_data: Callable[[], pd.DataFrame], tester_example_data: Callable[[], pd.DataFrame],
+                       parser: UploadParser, tester_parser: UploadParser, dataset_cache: DatasetCache,
+                       figure_cache: FigureCache, jobs: JobManager, snapshots: Optional[SnapshotStore] = None,
+                       store_codec: Optional[StoreCodec] = None):
+    # Example frames are built on first use rather than at startup.
+    # Aggregates are computed once per dataset and reused by every graph/calculation
+    @lru_cache(maxsize=1)
+    def example_aggregate():
+        return SuiteAggregate.from_frame(example_data())
+
+    def suite_aggregate_for(dataset_id):
+        if not dataset_id:
+            return example_aggregate()
+        return dataset_cache.derived(dataset_id, "suite_aggregate", SuiteAggregate.from_frame)
+
+    # active-df-store and active-tester-df-store hold dataset IDs, or with a
+    # store_codec the encoded frame too (see services.store_codec)
+    def store_value(dataset_id, frame):
+        return inline_store(frame, store_codec) if store_codec else dataset_id
+
+    def dataset_id_for(store):
+        # A worker that didn't parse an inline dataset (and shares no spill
+        # directory) caches it from the store value instead of asking for it
+        # again. Under the hash of what it decoded: the store's own ID is the
+        # client's word, trusting it would let a crafted value replace the
+        # dataset another session uploaded under that ID. For a genuine store
+        # both are the same, so each worker hashes a payload once.
+        dataset_id = store_dataset_id(store)
+        if not dataset_id or dataset_id in dataset_cache or not isinstance(store, dict) or "data" not in store:
+            return dataset_id
+        dataset_id = inline_dataset_id(store)
+        if dataset_id not in dataset_cache:
+            dataset_cache.put(dataset_id, decode_store(store))
+        return dataset_id
+
+    upload_ids: "OrderedDict[str, str]" = OrderedDict()
+    upload_ids_lock = threading.Lock()
+
+    def cached_upload(contents: str, parse: Callable[[], tuple]):
+        """
+        An upload's frame, parse()d unless this or another worker already has
+        it, with its validation report and store value. With a store_codec the
+        frame is cached under its inline store's ID rather than the upload's
+        hash, so every worker knows it by the same ID.
+        """
+        upload_hash = content_hash(contents)
+        with upload_ids_lock:
+            dataset_id = upload_ids.get(upload_hash, upload_hash)
+        df = dataset_cache.get(dataset_id)
+        validation = None
+        if df is None:
+            df, validation = parse()
+            store = store_value(upload_hash, df)
+            dataset_id = store_dataset_id(store)
+            dataset_cache.put(dataset_id, df)
+            if dataset_id != upload_hash:
+                with upload_ids_lock:
+                    upload_ids[upload_hash] = dataset_id
+                    while len(upload_ids) > UPLOAD_IDS:
+                        upload_ids.popitem(last=False)
+        else:
+            store = store_value(dataset_id, df)
+        return dataset_id, df, validation_report_for(dataset_id, validation), store
+
+    def validation_report_for(dataset_id, report=None):
+        # Kept with the dataset so re-uploads show it too. A frame another
+        # worker spilled comes without one, it was reported there.
+        return dataset_cache.derived(dataset_id, "validation_report", lambda _: report)
+
+    @lru_cache(maxsize=1)
+    def example_rates():
+        return average_hourly_rate(tester_example_data())
+
+    def rates_for(tester_dataset_id):
+        if not tester_dataset_id:
+            return example_rates()
+        return dataset_cache.derived(tester_dataset_id, "hourly_rates", average_hourly_rate)
 
+    def job_progress(progress: float, message: str):
+        return html.Div([
+            html.Progress(value=str(progress), max="1", style={"marginRight": "10px"}),
+            html.Span(message),
+        ])
 
-def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.DataFrame, parser: UploadParser, tester_parser: UploadParser):
+    def poll_job(prefix: str, *outputs):
+        # While a background job runs its dcc.Interval polls here. Progress goes
+        # to the first output, the job's result tuple fills all of them at the end.
+        @app.callback(
+            *[Output(component_id, prop, allow_duplicate=True) for component_id, prop in outputs],
+            Output(f"{prefix}-store", "data", allow_duplicate=True),
+            Output(f"{prefix}-poll", "disabled", allow_duplicate=True),
+            Input(f"{prefix}-poll", "n_intervals"),
+            State(f"{prefix}-store", "data"),
+            prevent_initial_call=True,
+        )
+        def on_poll(_, job_id):
+            status = jobs.pop(job_id)
+            rest = (no_update,) * (len(outputs) - 1)
+            if not status.finished:
+                return (job_progress(status.progress, status.message),) + rest + (no_update, False)
+            if status.state == "done":
+                return tuple(status.result) + (None, True)
+            if status.state == "failed":
+                err = html.Div(f"Error: {status.error}", style={"color": "crimson"})
+                return (err,) + rest + (None, True)
+            if status.state == "unknown":
+                # Expired, or its job file was lost (e.g. the server restarted)
+                err = html.Div("This job is no longer known to the server, please try again.",
+                               style={"color": "crimson"})
+                return (err,) + rest + (None, True)
+            # cancelled, a newer job owns these outputs now
+            return (no_update,) + rest + (None, True)
 
     # 1) Download example.csv
     @app.callback(
@@ -19,33 +157,90 @@ def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.Data
     )
     def on_download(_):
         # Called after the first click
-        return dcc.send_data_frame(example_df.to_csv, "qa_example.csv", index=False)
+        return dcc.send_data_frame(example_data().to_csv, "qa_example.csv", index=False)
+
+    # 2) Preview table + store active dataset ID (None means example data).
+    #    Uploads are parsed by a background job, a newer upload cancels it.
+    def save_snapshot(suite, aggregate, dataset_id, tester_dataset_id, runs_per_release, releases):
+        # History is best effort, a locked or read-only database mustn't fail the upload
+        rates = rates_for(tester_dataset_id)
+        if rates is None:
+            return
+        try:
+            snapshots.save(suite, aggregate, rates, runs_per_release, releases, 12.0,
+                           dataset_id=dataset_id, tester_dataset_id=tester_dataset_id)
+        except sqlite3.Error as e:
+            logger.warning("Could not save a snapshot of %s: %s", suite, e)
+
+    def load_test_cases(report, contents: str, filename: str, last_modified: int,
+                        tester_dataset_id=None, runs_per_release=1, releases=12):
+        try:
+            def parse():
+                report(0.1, "Reading file")
+                df, validation = parser.read_validated(contents, filename)
+                report(0.6, "Compacting columns")
+                return compact_test_cases(df), validation
+
+            with phase("pandas"):
+                dataset_id, df, validation, store = cached_upload(contents, parse)
+                report(0.8, "Aggregating suite totals")
+                aggregate = suite_aggregate_for(dataset_id)
+            if snapshots is not None:
+                save_snapshot(Path(filename).stem, aggregate, dataset_id, tester_dataset_id,
+                              runs_per_release or 1, releases or 12)
+            report(0.9, "Rendering preview")
+            return [parser.render_preview(df, filename, last_modified, validation)], store
+        except JobCancelled:
+            raise
+        except Exception as e:
+            err = html.Div(f"Error processing file: {e}", style={"color": "crimson"})
+            return [err], None
 
-    # 2) Preview table + store active data (uploaded or example)
     @app.callback(
         Output("output-data-upload", "children"),
         Output("active-df-store", "data"),
+        Output("upload-job-store", "data"),
+        Output("upload-job-poll", "disabled"),
         Input("upload-data", "contents"),
         State("upload-data", "filename"),
         State("upload-data", "last_modified"),
+        State("upload-job-store", "data"),
+        State("active-tester-df-store", "data"),
+        State("input-runs", "value"),
+        State("input-releases", "value"),
         prevent_initial_call=False,
     )
-    def on_upload(contents: str, filename: str, last_modified: int):
+    def on_upload(contents: str, filename: str, last_modified: int, running_job_id,
+                  tester_store, runs_per_release, releases):
+        tester_dataset_id = dataset_id_for(tester_store)
         if contents is None:
-            data_frame = example_df.copy()
-            table = dash_table.DataTable(
-                data=data_frame.to_dict("records"),
-                columns=[{"name": i, "id": i} for i in data_frame.columns],
-                page_size=6,
-            )
-            return [html.H5("Using example data"), table], data_frame.to_dict("records")
+            table = preview_table(parser.table_id, example_data(), parser.columns, page_size=6)
+            return [html.H5("Using example data"), table], None, None, True
 
-        try:
-            preview, df = parser.parse_contents(contents, filename, last_modified)
-            return [preview], df.to_dict("records")
-        except Exception as e:
-            err = html.Div(f"Error processing file: {e}", style={"color": "crimson"})
-            return [err], example_df.to_dict("records")
+        job_id = jobs.submit(load_test_cases, contents, filename, last_modified,
+                             tester_dataset_id, runs_per_release, releases, replaces=running_job_id)
+        return job_progress(0.0, f"Processing {filename}"), no_update, job_id, False
+
+    poll_job("upload-job", ("output-data-upload", "children"), ("active-df-store", "data"))
+
+    # 2b) Serve preview pages from the cached frame
+    @app.callback(
+        Output(parser.table_id, "data"),
+        Output(parser.table_id, "page_count"),
+        Input(parser.table_id, "page_current"),
+        Input(parser.table_id, "page_size"),
+        Input(parser.table_id, "sort_by"),
+        Input(parser.table_id, "filter_query"),
+        State("active-df-store", "data"),
+        prevent_initial_call=True,
+    )
+    def on_preview_page(page_current, page_size, sort_by, filter_query, store):
+        dataset_id = dataset_id_for(store)
+        data_frame = dataset_cache.get(dataset_id) if dataset_id else example_data()
+        if data_frame is None:
+            return [], 1
+        with phase("pandas"):
+            return table_page(data_frame, parser.columns, page_current, page_size, sort_by, filter_query)
 
 
     # 3) Show checklist after button clicked
@@ -62,8 +257,12 @@ def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.Data
             id="graph-checklist",
             options=[
                 {"label": "ROI Over Time", "value": "ROI"},
+                {"label": "ROI Uncertainty", "value": "Uncertainty"},
                 {"label": "Manual vs Automation Testcases", "value": "Manual vs Automation Testcases"},
                 {"label": "Execution Time Savings", "value": "Time"},
+                {"label": "Break-even Scenarios", "value": "Scenarios"},
+                {"label": "Per-test Payback Ranking", "value": "Ranking"},
+                {"label": "ROI Trend", "value": "Trend"},
             ],
             value=["ROI"],
             labelStyle={"display": "flex", "padding": "10px 12px", "border": "1px solid #e5e7eb",
@@ -88,31 +287,45 @@ def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.Data
         ]
         return dcc.Tabs(id="graph-tabs", value=selected_graphs[0], children=tabs)
 
-    # 5) Statement to show graphs per tab
-    @app.callback(
-        Output("tab-content", "children"),
-        Input("graph-tabs", "value"),
-        Input("input-runs", "value"),
-        Input("input-releases", "value"),
-        State("active-df-store", "data"),
-        State("active-tester-df-store", "data"),
-        prevent_initial_call=True
-    )
-    def render_graph(tab_value, runs_per_release, releases, records, tester_records):
-        runs_per_release = runs_per_release or 1
-        releases = releases or 12
-        data_frame = pd.DataFrame(records) if records else example_df
-        tester_df = pd.DataFrame(tester_records) if tester_records else tester_example_df
+    # 5) Statement to show graphs per tab. Cached figures render straight
+    #    away, anything that has to be computed runs as a background job.
+    class FigureNotCached(Exception):
+        pass
+
+    def cached_figure(key, builder):
+        figure = figure_cache.get(key)
+        if figure is None:
+            raise FigureNotCached()
+        return figure
+
+    def build_tab(tab_value, runs_per_release, releases, dataset_id, tester_dataset_id, get_figure, report):
+        with phase("pandas"):
+            aggregate = suite_aggregate_for(dataset_id)
+        tester_df = dataset_cache.get(tester_dataset_id) if tester_dataset_id else tester_example_data()
+        if aggregate is None or tester_df is None:
+            return html.Div(
+                "The uploaded data is no longer cached on the server, please upload it again.",
+                style={"color": "crimson"},
+            )
+
+        def figure_key(graph, *params):
+            # Dataset IDs are content hashes, so equal keys mean equal figures
+            return (dataset_id or "example", tester_dataset_id or "example", graph) + params
 
         if tab_value in ("Manual vs Automation Testcases", "Cost", "COST"):
-            figure = manual_automation_comparison_graph(data_frame)
+            figure = get_figure(
+                figure_key("comparison"), lambda: manual_automation_comparison_graph(aggregate)
+            )
             description = (
                 "Counts test cases tagged for automation against those kept manual,"
                 " helping estimate how much of the suite could be automated."
             )
             return html.Div([dcc.Graph(figure=figure), html.P(description)])
         elif tab_value == "Time":
-            figure = execution_savings_time_graph(data_frame, runs_per_release=1, releases=12)
+            figure = get_figure(
+                figure_key("time", 1, 12),
+                lambda: execution_savings_time_graph(aggregate, runs_per_release=1, releases=12),
+            )
             description = (
                 "Totals manual hours (manual_time_min/60 * runs * releases) versus"
                 " automated hours (exec_time_sec/3600 * runs * releases) to show"
@@ -120,21 +333,152 @@ def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.Data
             )
             return html.Div([dcc.Graph(figure=figure), html.P(description)])
         elif tab_value == "ROI":
-            figure = roi_over_time_graph(
-                data_frame,
-                tester_df,
-                runs_per_release=runs_per_release,
-                releases=releases,
-                releases_per_year=12.0,
-            )
+            # Drawn in the browser from roi-coefficients-store (assets/roi_clientside.js)
             description = (
                 "Plots cumulative manual cost (manual hours * manual rate) against automation"
                 " cost (development + execution + maintenance) and marks the release"
                 " where automation becomes cheaper."
             )
+            return html.Div([dcc.Graph(id="roi-graph"), html.P(description)])
+        elif tab_value == "Uncertainty":
+            # Monte Carlo needs the per-row estimates, not just the totals
+            report(0.1, "Running simulations")
+            figure = get_figure(
+                figure_key("roi_fan", runs_per_release, releases, 12.0),
+                lambda: roi_fan_chart_graph(
+                    dataset_cache.get(dataset_id) if dataset_id else example_data(),
+                    tester_df,
+                    runs_per_release=runs_per_release,
+                    releases=releases,
+                    releases_per_year=12.0,
+                    progress=lambda done: report(0.1 + 0.8 * done, "Running simulations"),
+                ),
+            )
+            description = (
+                "Varies development, execution and maintenance estimates by ±25% to show"
+                " the P10-P90 ROI range and the chance of breaking even."
+            )
+            return html.Div([dcc.Graph(figure=figure), html.P(description)])
+        elif tab_value == "Scenarios":
+            figure = get_figure(
+                figure_key("scenarios"), lambda: roi_scenario_heatmap_graph(aggregate, tester_df)
+            )
+            description = (
+                "Shows how many months automation takes to pay for itself for every"
+                " combination of release cadence and runs per release, so you can see"
+                " which cadences break even within a year."
+            )
+            return html.Div([dcc.Graph(figure=figure), html.P(description)])
+        elif tab_value == "Ranking":
+            # Ranking is per row, so it needs the frame rather than the aggregate
+            figure = get_figure(
+                figure_key("ranking", runs_per_release, releases, 12.0),
+                lambda: roi_ranking_graph(
+                    dataset_cache.get(dataset_id) if dataset_id else example_data(),
+                    tester_df,
+                    runs_per_release=runs_per_release,
+                    releases=releases,
+                    releases_per_year=12.0,
+                ),
+            )
+            description = (
+                "Ranks the automation candidates that pay for themselves fastest, using each"
+                " test case's own development, execution and maintenance estimates and its"
+                " runs_per_release_override where set."
+            )
+            return html.Div([dcc.Graph(figure=figure), html.P(description)])
+        elif tab_value == "Trend":
+            # Snapshots change with every upload, so the figure isn't cached
+            if snapshots is None:
+                return html.Div("Upload history is off: start the app with create_app(snapshot_db=...) to keep it.")
+            suite = snapshots.suite_of(dataset_id) if dataset_id else None
+            if suite is None:
+                return html.Div("Upload a suite to start its ROI history.")
+            with phase("plotly"):
+                figure = roi_trend_graph(snapshots.trend(suite, limit=TREND_SNAPSHOTS), suite)
+            description = (
+                f"Break-even release and ROI at the horizon of the last {TREND_SNAPSHOTS} uploads of"
+                f" {suite}, each evaluated with the tester pool and inputs active when it was uploaded."
+            )
             return html.Div([dcc.Graph(figure=figure), html.P(description)])
         return html.H3(f"You clicked the {tab_value} tab")
 
+    def build_figure(key, builder):
+        # Builders run the calculations too, but their cost is dominated by Plotly
+        with phase("plotly"):
+            return figure_cache.get_or_build(key, builder)
+
+    def build_tab_job(report, *args):
+        return (build_tab(*args, get_figure=build_figure, report=report),)
+
+    # Tabs redrawn on the server when runs/releases change, the ROI tab is
+    # redrawn clientside instead
+    TABS_USING_INPUTS = ("Uncertainty", "Ranking")
+
+    @app.callback(
+        Output("tab-content", "children"),
+        Output("graph-job-store", "data"),
+        Output("graph-job-poll", "disabled"),
+        Output("active-tab-store", "data"),
+        Input("graph-tabs", "value"),
+        Input("graph-params-store", "data"),
+        State("input-runs", "value"),
+        State("input-releases", "value"),
+        State("active-df-store", "data"),
+        State("active-tester-df-store", "data"),
+        State("graph-job-store", "data"),
+        prevent_initial_call=True
+    )
+    def render_graph(tab_value, _params, runs_per_release, releases, store, tester_store, running_job_id):
+        args = (tab_value, runs_per_release or 1, releases or 12, dataset_id_for(store), dataset_id_for(tester_store))
+        active_tab = {"tab": tab_value, "uses_inputs": tab_value in TABS_USING_INPUTS}
+        try:
+            content = build_tab(*args, get_figure=cached_figure, report=lambda *_: None)
+            if running_job_id:
+                jobs.cancel(running_job_id)
+            return content, None, True, active_tab
+        except FigureNotCached:
+            job_id = jobs.submit(build_tab_job, *args, replaces=running_job_id)
+            return job_progress(0.0, "Building graphs"), job_id, False, active_tab
+
+    app.clientside_callback(
+        ClientsideFunction("qalculator", "graphParams"),
+        Output("graph-params-store", "data"),
+        Input("input-runs", "value"),
+        Input("input-releases", "value"),
+        State("active-tab-store", "data"),
+    )
+
+    # The ROI model is linear in runs and releases: the server sends its
+    # coefficients once per dataset and the browser redraws the tab from them.
+    # roi-graph.id is an input so the figure is drawn when the tab mounts.
+    @app.callback(
+        Output("roi-coefficients-store", "data"),
+        Input("active-df-store", "data"),
+        Input("active-tester-df-store", "data"),
+        prevent_initial_call=False
+    )
+    def update_roi_coefficients(store, tester_store):
+        # Aggregate and rates are memoized with their datasets, the
+        # coefficients are a handful of products of the two
+        with phase("pandas"):
+            aggregate = suite_aggregate_for(dataset_id_for(store))
+            rates = rates_for(dataset_id_for(tester_store))
+        if aggregate is None or rates is None:
+            return None
+        return {**roi_coefficients(aggregate, rates), "releases_per_year": 12.0}
+
+    app.clientside_callback(
+        ClientsideFunction("qalculator", "roiFigure"),
+        Output("roi-graph", "figure"),
+        Input("input-runs", "value"),
+        Input("input-releases", "value"),
+        Input("roi-coefficients-store", "data"),
+        Input("roi-graph", "id"),
+    )
+
+    poll_job("graph-job", ("tab-content", "children"))
+
 
     # 6) Download tester data
     @app.callback(
@@ -144,30 +488,63 @@ def register_callbacks(app, example_df: pd.DataFrame, tester_example_df: pd.Data
     )
     def on_download_tester_data(_):
         # Called after the first click
-        return dcc.send_data_frame(tester_example_df.to_csv, "qa_tester_example.csv", index=False)
+        return dcc.send_data_frame(tester_example_data().to_csv, "qa_tester_example.csv", index=False)
+
+    # 7) Preview table + store tester dataset ID (None means example data),
+    #    parsed in the background like the test cases
+    def load_testers(report, contents: str, filename: str, last_modified: int):
+        try:
+            report(0.1, "Reading file")
+            def parse():
+                df, validation = tester_parser.read_validated(contents, filename)
+                return compact_testers(df), validation
+
+            with phase("pandas"):
+                _, df, validation, store = cached_upload(contents, parse)
+            report(0.9, "Rendering preview")
+            return [tester_parser.render_preview(df, filename, last_modified, validation)], store
+        except JobCancelled:
+            raise
+        except Exception as e:
+            err = html.Div(f"Error processing file: {e}", style={"color": "crimson"})
+            return [err], None
 
-    # 7) Preview table + store testdata data (uploaded or example)
     @app.callback(
         Output("output-testdata-upload", "children"),
         Output("active-tester-df-store", "data"),
+        Output("tester-upload-job-store", "data"),
+        Output("tester-upload-job-poll", "disabled"),
         Input("upload-tester-data", "contents"),
         State("upload-tester-data", "filename"),
         State("upload-tester-data", "last_modified"),
+        State("tester-upload-job-store", "data"),
         prevent_initial_call=False,
     )
-    def on__tester_details_upload(contents: str, filename: str, last_modified: int):
+    def on__tester_details_upload(contents: str, filename: str, last_modified: int, running_job_id):
         if contents is None:
-            tester_data_frame = tester_example_df.copy()
-            table = dash_table.DataTable(
-                data=tester_data_frame.to_dict("records"),
-                columns=[{"name": i, "id": i} for i in tester_data_frame.columns],
-                page_size=6,
-            )
-            return [html.H5("Using example data"), table], tester_data_frame.to_dict("records")
+            table = preview_table(tester_parser.table_id, tester_example_data(), tester_parser.columns, page_size=6)
+            return [html.H5("Using example data"), table], None, None, True
 
-        try:
-            preview, df = tester_parser.parse_contents(contents, filename, last_modified)
-            return [preview], df.to_dict("records")
-        except Exception as e:
-            err = html.Div(f"Error processing file: {e}", style={"color": "crimson"})
-            return [err], tester_example_df.to_dict("records")
\ No newline at end of file
+        job_id = jobs.submit(load_testers, contents, filename, last_modified, replaces=running_job_id)
+        return job_progress(0.0, f"Processing {filename}"), no_update, job_id, False
+
+    poll_job("tester-upload-job", ("output-testdata-upload", "children"), ("active-tester-df-store", "data"))
+
+    # 7b) Serve tester preview pages from the cached frame
+    @app.callback(
+        Output(tester_parser.table_id, "data"),
+        Output(tester_parser.table_id, "page_count"),
+        Input(tester_parser.table_id, "page_current"),
+        Input(tester_parser.table_id, "page_size"),
+        Input(tester_parser.table_id, "sort_by"),
+        Input(tester_parser.table_id, "filter_query"),
+        State("active-tester-df-store", "data"),
+        prevent_initial_call=True,
+    )
+    def on_tester_preview_page(page_current, page_size, sort_by, filter_query, store):
+        dataset_id = dataset_id_for(store)
+        data_frame = dataset_cache.get(dataset_id) if dataset_id else tester_example_data()
+        if data_frame is None:
+            return [], 1
+        with phase("pandas"):
+            return table_page(data_frame, tester_parser.columns, page_current, page_size, sort_by, filter_query)
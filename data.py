@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import lru_cache
 
 import pandas as pd
 
@@ -24,8 +25,71 @@ class CsvSchema:
         "hours_per_month"
     )
 
+    # Explicit read dtypes, so nothing has to be inferred from the data
+    dtypes = {
+        "test_id": str,
+        "title": str,
+        "risk": str,
+        "manual_time_min": "float64",
+        "candidate_for_automation": str,
+        "dev_time_hours": "float64",
+        "exec_time_sec": "float64",
+        "maintenance_pct_per_month": "float64",
+        "runs_per_release_override": "float64",
+    }
+
+    tester_dtypes = {
+        "name": str,
+        "role": str,
+        "monthly_salary": "float64",
+        "hours_per_month": "float64",
+    }
+
+    # In-memory dtypes of the compute copy, see services.compaction
+    compact_dtypes = {
+        "risk": "category",
+        "manual_time_min": "float32",
+        "candidate_for_automation": "category",
+        "dev_time_hours": "float32",
+        "exec_time_sec": "float32",
+        "maintenance_pct_per_month": "float32",
+        "runs_per_release_override": "float32",
+    }
+
+    # Tester pools are small, only the role labels are worth compacting and
+    # salaries stay float64 so hourly rates keep full precision.
+    tester_compact_dtypes = {
+        "role": "category",
+    }
+
+    # Row-level checks on upload, see services.validation. Ranges are
+    # inclusive (min, max), None is unbounded. Out-of-range values and text in
+    # numeric columns are reported and then ignored like blanks.
+    value_ranges = {
+        "manual_time_min": (0, None),
+        "dev_time_hours": (0, None),
+        "exec_time_sec": (0, None),
+        "maintenance_pct_per_month": (0, 100),
+        "runs_per_release_override": (0, None),
+    }
+    # Normalised (strip + lower) labels, blanks are allowed and count as candidates
+    allowed_labels = {
+        "candidate_for_automation": ("yes", "auto", "no"),
+    }
+    required = ("test_id",)
+
+    tester_value_ranges = {
+        "monthly_salary": (0, None),
+        "hours_per_month": (0, None),
+    }
+    tester_allowed_labels = {}
+    tester_required = ("role",)
+
+# The example frames are built once, on first use, and shared afterwards:
+# callers must treat them as read-only.
 class ExampleData:
     @staticmethod
+    @lru_cache(maxsize=1)
     def data_frame() -> pd.DataFrame:
         dataframe = pd.DataFrame({
             "test_id": [
@@ -72,6 +136,7 @@ class ExampleData:
 
 class ExampleTesters:
     @staticmethod
+    @lru_cache(maxsize=1)
     def tester_data_frame() -> pd.DataFrame:
         tester_df = pd.DataFrame({
             "name": [
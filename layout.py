@@ -1,11 +1,11 @@
-import pandas as pd
 from dash import html, dcc
 
 
 class Layout:
-    def __init__(self, title: str, example_data_frame: pd.DataFrame, example_tester_data: pd.DataFrame):
+    # The layout only references the example data by component ID, so the
+    # example frames don't need to exist to build it.
+    def __init__(self, title: str):
         self.title = title
-        self.example_data_frame = example_data_frame
 
 
     def build(self):
@@ -49,10 +49,26 @@ class Layout:
             ], style={"display": "flex", "justifyContent": "center", "alignItems": "center", "gap": "10px",
                       "margin": "20px 0"}),
 
-            # Store active data (uploaded or example)
+            # Store active dataset IDs, the parsed frames stay in the server-side cache
+            # (or travel along too with create_app(store_codec=...))
             dcc.Store(id="active-df-store"),
             dcc.Store(id="active-tester-df-store"),
 
+            # ROI coefficients of the active datasets, the ROI tab is redrawn from
+            # them in the browser. The graph tab's runs/releases trigger and the
+            # open tab, so the browser knows when the server has to recompute.
+            dcc.Store(id="roi-coefficients-store"),
+            dcc.Store(id="graph-params-store"),
+            dcc.Store(id="active-tab-store"),
+
+            # Background job IDs, each polled by its interval while the job runs
+            dcc.Store(id="upload-job-store"),
+            dcc.Interval(id="upload-job-poll", interval=500, disabled=True),
+            dcc.Store(id="tester-upload-job-store"),
+            dcc.Interval(id="tester-upload-job-poll", interval=500, disabled=True),
+            dcc.Store(id="graph-job-store"),
+            dcc.Interval(id="graph-job-poll", interval=500, disabled=True),
+
             # Upload preview
             html.Div(id="output-data-upload"),
             html.Div(id="output-testdata-upload"),
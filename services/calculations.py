@@ -1,44 +1,245 @@
 import array
-from typing import Tuple, Dict
+import threading
+import weakref
+from dataclasses import dataclass, fields
+from typing import Tuple, Dict, Union
 import pandas as pd
 import numpy as np
 
-def manual_automation_comparison(data_frame: pd.DataFrame):
-    df = data_frame.copy()
-    column_name = "candidate_for_automation"
-    col = df[column_name].astype(str).str.strip().str.lower()
+
+@dataclass(frozen=True)
+class SuiteAggregate:
+    """
+    Suite-level totals every calculation needs, built in one pass over the
+    test-case frame. Totals are additive so aggregates of chunks can be merged.
+    """
+    row_count: int = 0
+    automation_count: int = 0
+    manual_only_count: int = 0
+    candidate_count: int = 0
+    manual_minutes: float = 0.0
+    exec_seconds: float = 0.0
+    dev_hours: float = 0.0
+    candidate_dev_hours: float = 0.0
+    candidate_exec_seconds: float = 0.0
+    candidate_maintenance_pct: float = 0.0
+    override_runs: float = 0.0
+    default_runs_rows: int = 0
+
+    @classmethod
+    def from_frame(cls, data_frame: pd.DataFrame) -> "SuiteAggregate":
+        is_automation, candidates = candidate_masks(data_frame)
+
+        manual_minutes = _float_values(data_frame["manual_time_min"])
+        exec_seconds = _float_values(data_frame["exec_time_sec"])
+        dev_hours = _float_values(data_frame["dev_time_hours"])
+        maintenance = _float_values(data_frame["maintenance_pct_per_month"])
+
+        runs_overrides = pd.to_numeric(data_frame["runs_per_release_override"], errors="coerce")
+        runs_overrides = runs_overrides.to_numpy(dtype=np.float64, na_value=np.nan)
+        has_override = runs_overrides > 0
+
+        return cls(
+            row_count=len(data_frame),
+            automation_count=int(is_automation.sum()),
+            manual_only_count=int((~candidates).sum()),
+            candidate_count=int(candidates.sum()),
+            manual_minutes=float(manual_minutes.sum()),
+            exec_seconds=float(exec_seconds.sum()),
+            dev_hours=float(dev_hours.sum()),
+            candidate_dev_hours=float(dev_hours[candidates].sum()),
+            candidate_exec_seconds=float(exec_seconds[candidates].sum()),
+            candidate_maintenance_pct=float(maintenance[candidates].sum()),
+            override_runs=float(runs_overrides[has_override].sum()),
+            default_runs_rows=int((~has_override).sum()),
+        )
+
+    def merge(self, other: "SuiteAggregate") -> "SuiteAggregate":
+        return SuiteAggregate(**{
+            f.name: getattr(self, f.name) + getattr(other, f.name) for f in fields(self)
+        })
+
+    @property
+    def maintenance_pct(self) -> float:
+        # Mean %/month over automation candidates as a 0..1 fraction
+        if self.candidate_count == 0:
+            return float("nan")
+        return self.candidate_maintenance_pct / self.candidate_count / 100.0
+
+    def total_runs(self, runs_per_release_global: int) -> int:
+        # Rows without a positive override run runs_per_release_global times
+        return max(1, int(self.override_runs + self.default_runs_rows * runs_per_release_global))
+
+
+SuiteData = Union[pd.DataFrame, SuiteAggregate]
+
+# Pre-normalised boolean column added by services.compaction
+CANDIDATE_FLAG_COLUMN = "automation_candidate"
+
+
+def _float_values(column: pd.Series) -> np.ndarray:
+    # Sums run in float64 even when the frame was compacted to float32
+    return column.to_numpy(dtype=np.float64, na_value=0.0)
+
+
+def normalised_labels(column: pd.Series) -> Tuple[pd.Index, np.ndarray]:
+    """
+    Normalises the distinct values of a text column (strip + lower) once and
+    returns them with per-row codes into them, missing values map to "nan" like
+    astype(str) would.
+    """
+    categorical = column if isinstance(column.dtype, pd.CategoricalDtype) else column.astype("category")
+    labels = categorical.cat.categories.astype(str).str.strip().str.lower().append(pd.Index(["nan"]))
+    codes = categorical.cat.codes.to_numpy().astype(np.intp)
+    # code -1 is missing, which indexes the trailing "nan" label
+    return labels, np.where(codes < 0, len(labels) - 1, codes)
+
+
+def candidate_masks(data_frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (tagged yes/auto, automation candidate) row masks. Anything not
+    tagged "no" counts as a candidate for the cost model.
+    """
+    labels, codes = normalised_labels(data_frame["candidate_for_automation"])
+    is_automation = labels.isin(["yes", "auto"])[codes]
+    if CANDIDATE_FLAG_COLUMN in data_frame:
+        candidates = data_frame[CANDIDATE_FLAG_COLUMN].to_numpy(dtype=bool)
+    else:
+        candidates = ~(labels == "no")[codes]
+    return is_automation, candidates
+
+
+def suite_aggregate(data: SuiteData) -> SuiteAggregate:
+    if isinstance(data, SuiteAggregate):
+        return data
+    return SuiteAggregate.from_frame(data)
+
+
+def manual_automation_comparison(data_frame: SuiteData):
+    aggregate = suite_aggregate(data_frame)
 
     counts = pd.DataFrame({
         "Category": ["Automation Candidates", "Manual Only"],
         "Count": [
-            (col.isin(["yes", "auto"])).sum(),
-            (col == "no").sum()
+            aggregate.automation_count,
+            aggregate.manual_only_count
         ]
     })
 
 
     return counts
 
-def average_hourly_rate(testers_df):
-    def avg_rate(role):
-        pool = testers_df[testers_df["role"] == role].copy()
-        if pool.empty:
-            return 0.0
-        pool["hourly_rate"] = pool["monthly_salary"] / pool["hours_per_month"].clip(lower=1)
-        return pool["hourly_rate"].mean()
+RATE_WEIGHTINGS = ("headcount", "salary")
 
-    return {
-        "manual_rate": avg_rate("manual"),
-        "automation_rate": avg_rate("automation")
-    }
+# Roles every cost function reads, reported as 0.0 when the pool has none
+CORE_ROLES = ("manual", "automation")
 
-def execution_time_savings(data_frame: pd.DataFrame, runs_per_release = 1, releases = 12):
-    df = data_frame.copy()
 
-    manual_total_hours = (df["manual_time_min"].fillna(0).sum() / 60) \
+@dataclass(frozen=True)
+class RateModel:
+    """
+    Hourly rate per tester role, built in one pass over the tester pool.
+
+    Roles are the normalised (strip + lower) labels of the role column, so a
+    pool can hold any mix such as sdet, lead or contractor. weighting
+    "headcount" averages the testers' own hourly rates, every tester counts
+    once. "salary" divides the role's total monthly salary by its total
+    hours, so better paid, longer working testers weigh more.
+    """
+    rates: Dict[str, float]
+    headcount: Dict[str, int]
+    weighting: str = "headcount"
+
+    @classmethod
+    def from_frame(cls, testers_df: pd.DataFrame, weighting: str = "headcount") -> "RateModel":
+        if weighting not in RATE_WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {RATE_WEIGHTINGS}, got {weighting!r}")
+        salary = pd.to_numeric(testers_df["monthly_salary"], errors="coerce").to_numpy(dtype=float)
+        hours = pd.to_numeric(testers_df["hours_per_month"], errors="coerce").to_numpy(dtype=float)
+        hours = np.clip(hours, 1, None)
+        hourly = salary / hours
+
+        # Labels differing only in case or spacing are one role
+        labels, codes = normalised_labels(testers_df["role"])
+        roles, inverse = np.unique(labels.to_numpy(dtype=str), return_inverse=True)
+        codes = inverse[codes]
+
+        n = len(roles)
+        valid = ~np.isnan(hourly)
+        members = np.bincount(codes, minlength=n)
+        counted = np.bincount(codes[valid], minlength=n)
+        if weighting == "headcount":
+            totals = np.bincount(codes[valid], weights=hourly[valid], minlength=n)
+        else:
+            totals = np.bincount(codes[valid], weights=salary[valid], minlength=n)
+            counted = np.bincount(codes[valid], weights=hours[valid], minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            role_rates = np.where(counted > 0, totals / counted, np.nan)
+
+        rates = {role: 0.0 for role in CORE_ROLES}
+        headcount = {role: 0 for role in CORE_ROLES}
+        for i, role in enumerate(roles):
+            if role == "nan" or members[i] == 0:
+                continue
+            rates[role] = float(role_rates[i])
+            headcount[role] = int(members[i])
+        return cls(rates, headcount, weighting)
+
+    def rate(self, role: str) -> float:
+        return self.rates.get(role.strip().lower(), 0.0)
+
+    def as_dict(self) -> Dict[str, float]:
+        # The {"manual_rate": ..., "automation_rate": ...} shape the cost functions take
+        return {f"{role.replace(' ', '_')}_rate": rate for role, rate in self.rates.items()}
+
+
+# pool id -> (weak reference to the pool, weighting -> model)
+_RATE_MODELS: Dict[int, Tuple[weakref.ref, Dict[str, RateModel]]] = {}
+# Reentrant: a pool dying while the lock is held runs forget() on the same thread
+_rate_models_lock = threading.RLock()
+
+
+def rate_model(testers_df: pd.DataFrame, weighting: str = "headcount") -> RateModel:
+    """
+    RateModel.from_frame memoized per tester pool for as long as the pool is
+    alive, so the cost functions taking a testers_df share one model instead
+    of each rescanning it. Pools must be treated as read-only, like every
+    cached frame. Uploaded pools are also memoized per content hash (their
+    dataset ID) by DatasetCache.derived.
+
+    Hashing the pool's contents would cost as much as building the model,
+    so the memo is keyed on the frame itself.
+    """
+    key = id(testers_df)
+    with _rate_models_lock:
+        entry = _RATE_MODELS.get(key)
+        if entry is not None and entry[0]() is testers_df and weighting in entry[1]:
+            return entry[1][weighting]
+
+    model = RateModel.from_frame(testers_df, weighting)
+    with _rate_models_lock:
+        entry = _RATE_MODELS.get(key)
+        if entry is None or entry[0]() is not testers_df:
+            def forget(ref, key=key):
+                with _rate_models_lock:
+                    if key in _RATE_MODELS and _RATE_MODELS[key][0] is ref:
+                        del _RATE_MODELS[key]
+            entry = _RATE_MODELS[key] = (weakref.ref(testers_df, forget), {})
+        entry[1][weighting] = model
+    return model
+
+
+def average_hourly_rate(testers_df, weighting: str = "headcount") -> Dict[str, float]:
+    # manual_rate and automation_rate, plus "<role>_rate" for any other role
+    return rate_model(testers_df, weighting).as_dict()
+
+def execution_time_savings(data_frame: SuiteData, runs_per_release = 1, releases = 12):
+    aggregate = suite_aggregate(data_frame)
+
+    manual_total_hours = (aggregate.manual_minutes / 60) \
     * runs_per_release * releases
 
-    automation_total_hours = (df["exec_time_sec"].fillna(0).sum() / 3600) \
+    automation_total_hours = (aggregate.exec_seconds / 3600) \
     * runs_per_release * releases
 
     savings_hours = manual_total_hours - automation_total_hours
@@ -57,11 +258,13 @@ def make_roi_figure(releases: int, releases_per_year: float) -> float:
     return (releases / max(1.0, releases_per_year)) * 12.0
 
 def compute_cost_components(
-    df: pd.DataFrame,
+    df: SuiteData,
     average_hourly_rate: Dict[str, float],
     runs_per_release_global: int,
 ) -> Tuple[float, float, float, float, int]:
     """
+    Accepts the test-case frame or its precomputed SuiteAggregate.
+
     Returns:
       manual_cost_per_release,
       automation_initial_cost,
@@ -69,33 +272,24 @@ def compute_cost_components(
       maintenance_pct_weighted (0..1),
       total_runs_this_release (int)
     """
+    aggregate = suite_aggregate(df)
+
     # Manual
-    total_manual_hours = df["manual_time_min"].fillna(0).sum() / 60.0
+    total_manual_hours = aggregate.manual_minutes / 60.0
     manual_cost_per_run = total_manual_hours * average_hourly_rate['manual_rate']
 
-    runs_overrides = pd.to_numeric(
-        df["runs_per_release_override"], errors="coerce"
-    ).fillna(runs_per_release_global)
-    runs_overrides = runs_overrides.where(
-        runs_overrides > 0, runs_per_release_global
-    )
-    total_runs_this_release = max(1, int(runs_overrides.sum()))
+    total_runs_this_release = aggregate.total_runs(runs_per_release_global)
     manual_cost_per_release = manual_cost_per_run * total_runs_this_release
 
-    # Candidates for automation
-    candidates = ~df["candidate_for_automation"].astype(str).str.strip().str.lower().eq("no")
-
-    # Dev (initial) cost
-    dev_hours = df.loc[candidates, "dev_time_hours"].fillna(0).sum()
-    automation_initial_cost = dev_hours * average_hourly_rate["automation_rate"]
+    # Dev (initial) cost of the automation candidates
+    automation_initial_cost = aggregate.candidate_dev_hours * average_hourly_rate["automation_rate"]
 
     # Execution cost per release
-    exec_seconds_per_run = df.loc[candidates, "exec_time_sec"].fillna(0).sum()
-    exec_hours_per_run = exec_seconds_per_run / 3600.0
+    exec_hours_per_run = aggregate.candidate_exec_seconds / 3600.0
     automation_run_cost_per_release = exec_hours_per_run * average_hourly_rate["automation_rate"] * total_runs_this_release
 
     # Maintenance (weighted mean of %/month)
-    maintenance_pct_weighted = df.loc[candidates, "maintenance_pct_per_month"].fillna(0).mean() / 100.0
+    maintenance_pct_weighted = aggregate.maintenance_pct
 
     return (
         manual_cost_per_release,
@@ -106,19 +300,52 @@ def compute_cost_components(
     )
 
 def roi_over_time(
-    df: pd.DataFrame,
+    df: SuiteData,
     average_hourly_rate: Dict[str, float],
     runs_per_release_global: int,
     releases: int,
     releases_per_year: float,
 ):
+    components = compute_cost_components(df, average_hourly_rate, runs_per_release_global)
+    return roi_from_components(components, releases, releases_per_year)
+
+
+def roi_coefficients(df: SuiteData, average_hourly_rate: Dict[str, float]) -> Dict[str, float]:
+    """
+    The scalars roi_over_time is linear in, for any runs per release: the
+    per-run costs get multiplied by aggregate.total_runs(runs) and the rest
+    is fixed per dataset. Small enough to send to the browser, which redraws
+    the ROI curve from them (see assets/roi_clientside.js).
+    """
+    aggregate = suite_aggregate(df)
+    maintenance_pct = aggregate.maintenance_pct
+    return {
+        "manual_cost_per_run": aggregate.manual_minutes / 60.0 * average_hourly_rate["manual_rate"],
+        "run_cost_per_run": aggregate.candidate_exec_seconds / 3600.0 * average_hourly_rate["automation_rate"],
+        "automation_initial_cost": aggregate.candidate_dev_hours * average_hourly_rate["automation_rate"],
+        # NaN (no candidates) isn't valid JSON, the browser reads None back as NaN
+        "maintenance_pct": None if np.isnan(maintenance_pct) else maintenance_pct,
+        "override_runs": aggregate.override_runs,
+        "default_runs_rows": aggregate.default_runs_rows,
+    }
+
+
+def roi_from_components(
+    components: Tuple[float, float, float, float, int],
+    releases: int,
+    releases_per_year: float,
+):
+    """
+    The horizon-dependent part of roi_over_time, from the output of
+    compute_cost_components. Only this part depends on releases and cadence.
+    """
     (
         manual_cost_per_release,
         automation_initial_cost,
         automation_run_cost_per_release,
         maintenance_pct,
         _,
-    ) = compute_cost_components(df, average_hourly_rate, runs_per_release_global)
+    ) = components
 
     months_per_release = 12.0 / max(releases_per_year, 1.0)
     maintenance_cost_per_release = (
@@ -169,26 +396,21 @@ def roi_over_time(
 
 
 
-def manual_testing_cost(data_frame: pd.DataFrame, testers_df: pd.DataFrame, runs_per_release = 1, releases = 12):
-    df = data_frame.copy()
-
-    manual_hours = (df["manual_time_min"].fillna(0).sum() / 60) \
+def manual_testing_cost(data_frame: SuiteData, testers_df: pd.DataFrame, runs_per_release = 1, releases = 12):
+    manual_hours = (suite_aggregate(data_frame).manual_minutes / 60) \
     * runs_per_release * releases
 
-    return manual_hours * average_hourly_rate(testers_df)["manual_rate"]
-
-def automation_exec_hours(data_frame: pd.DataFrame, testers_df: pd.DataFrame, runs_per_release = 1, releases = 12):
-    df = data_frame.copy()
+    return manual_hours * rate_model(testers_df).rate("manual")
 
-    return ((df["exec_time_sec"].fillna(0).sum() / 3600) 
+def automation_exec_hours(data_frame: SuiteData, testers_df: pd.DataFrame, runs_per_release = 1, releases = 12):
+    return ((suite_aggregate(data_frame).exec_seconds / 3600)
     * runs_per_release * releases) * average_automation_hourly_rate(testers_df)
 
 def average_automation_hourly_rate(testers_df: pd.DataFrame):
-    return average_hourly_rate(testers_df)["automation_rate"]
+    return rate_model(testers_df).rate("automation")
 
-def initial_development_cost(data_frame: pd.DataFrame, testers_df: pd.DataFrame):
-    return data_frame["dev_time_hours"].fillna(0).sum() * average_automation_hourly_rate(testers_df)
+def initial_development_cost(data_frame: SuiteData, testers_df: pd.DataFrame):
+    return suite_aggregate(data_frame).dev_hours * average_automation_hourly_rate(testers_df)
 
-def average_maintenance_pct_per_month(data_frame: pd.DataFrame):
-    candidates = ~data_frame["candidate_for_automation"].astype(str).str.strip().str.lower().eq("no")
-    return data_frame.loc[candidates, "maintenance_pct_per_month"].fillna(0).mean() / 100
+def average_maintenance_pct_per_month(data_frame: SuiteData):
+    return suite_aggregate(data_frame).maintenance_pct
@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from data import CsvSchema
+from services.calculations import CANDIDATE_FLAG_COLUMN, candidate_masks
+
+
+def compact_frame(
+    data_frame: pd.DataFrame,
+    compact_dtypes: Dict[str, str],
+    drop_columns: Iterable[str] = (),
+) -> pd.DataFrame:
+    """
+    Returns a copy of data_frame with the schema's compact dtypes applied.
+    Numeric columns are coerced first, so stray text becomes NaN instead of
+    blocking the downcast.
+    """
+    df = data_frame.drop(columns=[c for c in drop_columns if c in data_frame.columns])
+    for column, dtype in compact_dtypes.items():
+        if column not in df.columns:
+            continue
+        if dtype == "category":
+            df[column] = df[column].astype("category")
+        else:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(dtype)
+    return df
+
+
+def compact_test_cases(data_frame: pd.DataFrame, drop_title: bool = False) -> pd.DataFrame:
+    df = compact_frame(data_frame, CsvSchema.compact_dtypes, ["title"] if drop_title else ())
+
+    # Keep the candidate mask as a boolean, so calculations never touch the
+    # strings. candidate_for_automation itself stays as uploaded (a category,
+    # blanks still missing), it's what previews and exports show.
+    _, candidates = candidate_masks(df)
+    df[CANDIDATE_FLAG_COLUMN] = candidates
+    return df
+
+
+def compact_testers(testers_df: pd.DataFrame) -> pd.DataFrame:
+    return compact_frame(testers_df, CsvSchema.tester_compact_dtypes)
+
+
+def memory_report(data_frame: pd.DataFrame, compacted: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Deep memory usage per column, with the compacted frame side by side when
+    given. The last row holds the totals.
+    """
+    report = _column_memory(data_frame, "")
+    if compacted is not None:
+        report = pd.concat([report, _column_memory(compacted, "compact_")], axis=1)
+
+    report.loc["total"] = report.select_dtypes("number").sum()
+    if compacted is not None:
+        report["saving_pct"] = (1 - report["compact_bytes"] / report["bytes"]) * 100
+    return report
+
+
+def _column_memory(data_frame: pd.DataFrame, prefix: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        f"{prefix}dtype": data_frame.dtypes.astype(str),
+        f"{prefix}bytes": data_frame.memory_usage(index=False, deep=True),
+    })
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import pandas as pd
+
+from services.spill_store import SpillStore
+
+T = TypeVar("T")
+
+
+def content_hash(contents: str) -> str:
+    # Upload contents arrive as a base64 data URL, hashing it as-is is enough to
+    # identify identical uploads without decoding them first.
+    return hashlib.sha256(contents.encode("utf-8")).hexdigest()[:32]
+
+
+def frame_nbytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class DatasetCache:
+    """
+    Bounded, thread-safe LRU of parsed DataFrames keyed by dataset ID.
+
+    Eviction happens when either the entry count or the total (deep) memory
+    footprint goes over its limit, least recently used entries first. Frames
+    handed out are shared, callers must treat them as read-only.
+
+    Values derived from a frame (aggregates, rate models, ...) can be memoized
+    next to it with ``derived`` and are dropped together with the frame.
+
+    With a SpillStore, frames are also written to its shared directory and a
+    miss here falls back to it, so a dataset parsed by one worker process can
+    be served by any other. Spill hits are counted separately.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, max_entries: int = 64,
+                 spill: Optional[SpillStore] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.spill = spill
+        self._entries: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._sizes = {}
+        self._derived: Dict[str, Dict[str, Any]] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+        self.derived_hits = 0
+        self.derived_misses = 0
+
+    def put(self, dataset_id: str, frame: pd.DataFrame) -> str:
+        self._put_memory(dataset_id, frame)
+        if self.spill is not None:
+            self.spill.put(dataset_id, frame)
+        return dataset_id
+
+    def get(self, dataset_id: Optional[str]) -> Optional[pd.DataFrame]:
+        if dataset_id is None:
+            return None
+        with self._lock:
+            frame = self._entries.get(dataset_id)
+            if frame is not None:
+                self.hits += 1
+                self._entries.move_to_end(dataset_id)
+                return frame
+
+        frame = self.spill.get(dataset_id) if self.spill is not None else None
+        with self._lock:
+            if frame is None:
+                self.misses += 1
+                return None
+            self.spill_hits += 1
+            # Another thread may have loaded it meanwhile, share one frame
+            if dataset_id in self._entries:
+                return self._entries[dataset_id]
+        self._put_memory(dataset_id, frame)
+        return frame
+
+    def derived(self, dataset_id: Optional[str], name: str, factory: Callable[[pd.DataFrame], T]) -> Optional[T]:
+        frame = self.get(dataset_id)
+        if frame is None:
+            return None
+        with self._lock:
+            values = self._derived.get(dataset_id, {})
+            if name in values:
+                self.derived_hits += 1
+                return values[name]
+            self.derived_misses += 1
+
+        # Computed outside the lock, a full-frame derivation mustn't block
+        # every other session's get/put. If two threads race, the first
+        # value stored wins and both return it.
+        value = factory(frame)
+        with self._lock:
+            if self._entries.get(dataset_id) is not frame:
+                # Evicted or replaced meanwhile, don't attach it to another frame
+                return value
+            return self._derived.setdefault(dataset_id, {}).setdefault(name, value)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        with self._lock:
+            if dataset_id in self._entries:
+                return True
+        return self.spill is not None and dataset_id in self.spill
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            derived_lookups = self.derived_hits + self.derived_misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "spill_hits": self.spill_hits,
+                "hit_rate": (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+                "derived_hits": self.derived_hits,
+                "derived_misses": self.derived_misses,
+                "derived_hit_rate": self.derived_hits / derived_lookups if derived_lookups else 0.0,
+            }
+
+    def _put_memory(self, dataset_id: str, frame: pd.DataFrame) -> None:
+        nbytes = frame_nbytes(frame)
+        with self._lock:
+            self._discard(dataset_id)
+            self._entries[dataset_id] = frame
+            self._sizes[dataset_id] = nbytes
+            self._total_bytes += nbytes
+            self._evict()
+
+    def _discard(self, dataset_id: str) -> None:
+        if dataset_id in self._entries:
+            del self._entries[dataset_id]
+            self._derived.pop(dataset_id, None)
+            self._total_bytes -= self._sizes.pop(dataset_id)
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone is over budget,
+        # otherwise an oversized upload could never be rendered.
+        while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
@@ -0,0 +1,50 @@
+from typing import Sequence
+
+import numpy as np
+
+# Above this many points per trace Plotly's SVG renderer starts to lag,
+# WebGL (Scattergl) stays smooth into the hundreds of thousands
+WEBGL_THRESHOLD = 1_000
+
+# Points kept per trace after downsampling, a few per horizontal pixel
+MAX_LINE_POINTS = 2_000
+
+
+def downsample_indices(*ys: np.ndarray, max_points: int = MAX_LINE_POINTS, keep: Sequence[int] = ()) -> np.ndarray:
+    """
+    Sorted indices of the points to draw for lines sharing one x axis.
+
+    Splits the x range into buckets and keeps the first, last, lowest and
+    highest point of each bucket for every line (M4 aggregation), so peaks,
+    troughs and crossings survive at screen resolution. Indices in keep are
+    always included, e.g. the points either side of the break-even release.
+    Returns every index when the lines are already short enough.
+    """
+    n = len(ys[0]) if ys else 0
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(1, max_points // (4 * len(ys)))
+    size = -(-n // buckets)
+    starts = np.arange(0, n, size)
+    chosen = [starts, np.minimum(starts + size, n) - 1, np.asarray(keep, dtype=np.intp)]
+
+    padded_n = len(starts) * size
+    for y in ys:
+        y = np.asarray(y, dtype=float)
+        # Padding and NaNs never win a bucket's min or max
+        low = np.full(padded_n, np.inf)
+        low[:n] = np.where(np.isnan(y), np.inf, y)
+        high = np.full(padded_n, -np.inf)
+        high[:n] = np.where(np.isnan(y), -np.inf, y)
+        chosen.append(starts + low.reshape(-1, size).argmin(axis=1))
+        chosen.append(starts + high.reshape(-1, size).argmax(axis=1))
+
+    indices = np.unique(np.concatenate(chosen))
+    return indices[(indices >= 0) & (indices < n)]
+
+
+def crossing_indices(x: np.ndarray, at: float) -> np.ndarray:
+    # The points either side of x == at, so a downsampled line still crosses there
+    i = int(np.searchsorted(x, at))
+    return np.array([i - 1, i], dtype=np.intp)
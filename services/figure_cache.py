@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class FigureCache:
+    """
+    LRU of serialized Plotly figures with a time-to-live per entry.
+
+    Keys are tuples like (dataset ID, tester ID, graph type, *parameters).
+    Figures are kept as their JSON string and handed back as plain dicts, so
+    a hit costs a json.loads and no pandas or Plotly work.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        # Misses are only counted by get_or_build, which does the actual work
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry[0] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Dict[str, Any]:
+        figure = self.get(key)
+        if figure is not None:
+            return figure
+        now = self.clock()
+        with self._lock:
+            self.misses += 1
+
+        # Build outside the lock so one slow figure doesn't block other users
+        serialized = builder().to_json()
+        with self._lock:
+            self._entries[key] = (now, serialized)
+            self._entries.move_to_end(key)
+            self._evict(now)
+        return json.loads(serialized)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, now: float) -> None:
+        expired = [k for k, (created, _) in self._entries.items() if now - created > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
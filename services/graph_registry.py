@@ -1,15 +1,42 @@
+from typing import Callable, Optional, Sequence
+
+import numpy as np
 import pandas as pd
-import plotly
-import plotly.graph_objects as go
 
 from services.calculations import (
+    SuiteData,
     execution_time_savings,
     manual_automation_comparison,
     average_hourly_rate,
     roi_over_time,
 )
+from services.downsampling import WEBGL_THRESHOLD, crossing_indices, downsample_indices
+from services.monte_carlo import roi_monte_carlo
+from services.ranking import rank_test_cases
+from services.scenarios import roi_scenario_sweep
+
+# Plotly is imported inside the builders: plotly.express alone adds a few
+# hundred milliseconds to startup and no figure is needed until a graph tab opens.
+
+
+def preload() -> None:
+    # Pays the import cost up front, for servers that prefer it at boot
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+
+
+def _line_trace(x, y, name: str, mode: str = "lines+markers", downsampled: bool = False, **kwargs):
+    # Long lines are drawn with WebGL. Long or downsampled lines get no
+    # markers, they would no longer mark every release.
+    import plotly.graph_objects as go
 
-def manual_automation_comparison_graph(data_frame: pd.DataFrame):
+    if len(x) > WEBGL_THRESHOLD:
+        return go.Scattergl(x=x, y=y, name=name, mode="lines", **kwargs)
+    return go.Scatter(x=x, y=y, name=name, mode="lines" if downsampled else mode, **kwargs)
+
+
+def manual_automation_comparison_graph(data_frame: SuiteData):
+    import plotly.express
 
     counts = manual_automation_comparison(data_frame)
 
@@ -33,7 +60,9 @@ def manual_automation_comparison_graph(data_frame: pd.DataFrame):
     return figure
 
 
-def execution_savings_time_graph(data_frame: pd.DataFrame, runs_per_release: int = 1, releases: int = 12):
+def execution_savings_time_graph(data_frame: SuiteData, runs_per_release: int = 1, releases: int = 12):
+    import plotly.express
+
     # compute totals
     stats = execution_time_savings(data_frame, runs_per_release=runs_per_release, releases=releases)
 
@@ -70,7 +99,7 @@ def execution_savings_time_graph(data_frame: pd.DataFrame, runs_per_release: int
 
 
 def roi_over_time_graph(
-    data_frame: pd.DataFrame,
+    data_frame: SuiteData,
     testers_df: pd.DataFrame,
     runs_per_release: int = 1,
     releases: int = 12,
@@ -80,24 +109,28 @@ def roi_over_time_graph(
     roi_df, break_even_release, break_even_cost = roi_over_time(
         data_frame, rates, runs_per_release, releases, releases_per_year
     )
+    return roi_over_time_figure(roi_df, break_even_release, break_even_cost)
+
+
+def roi_over_time_figure(roi_df: pd.DataFrame, break_even_release: Optional[float], break_even_cost: Optional[float]):
+    # Draws an already computed roi_over_time result
+    import plotly.graph_objects as go
+
+    releases = int(roi_df["release"].iloc[-1])
+
+    # Long horizons are downsampled, keeping the releases either side of
+    # break-even so the lines still cross under the marker
+    release = roi_df["release"].to_numpy()
+    keep = crossing_indices(release, break_even_release) if break_even_release is not None else ()
+    shown = roi_df.iloc[downsample_indices(
+        roi_df["manual_cost"].to_numpy(), roi_df["automation_cost"].to_numpy(), keep=keep
+    )]
+
+    downsampled = len(shown) < len(roi_df)
 
     fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=roi_df["release"],
-            y=roi_df["manual_cost"],
-            mode="lines+markers",
-            name="Manual",
-        )
-    )
-    fig.add_trace(
-        go.Scatter(
-            x=roi_df["release"],
-            y=roi_df["automation_cost"],
-            mode="lines+markers",
-            name="Automation",
-        )
-    )
+    fig.add_trace(_line_trace(shown["release"], shown["manual_cost"], "Manual", downsampled=downsampled))
+    fig.add_trace(_line_trace(shown["release"], shown["automation_cost"], "Automation", downsampled=downsampled))
 
     if break_even_release is not None and break_even_cost is not None:
         fig.add_trace(
@@ -145,4 +178,196 @@ def roi_over_time_graph(
     return fig
 
 
+def roi_scenario_heatmap_graph(
+    data_frame: SuiteData,
+    testers_df: pd.DataFrame,
+    runs_per_release: Sequence[int] = tuple(range(1, 11)),
+    releases_per_year: Sequence[float] = (1, 2, 4, 6, 12, 26, 52),
+    rate_multiplier: float = 1.0,
+):
+    import plotly.graph_objects as go
 
+    rates = average_hourly_rate(testers_df)
+    sweep = roi_scenario_sweep(
+        data_frame,
+        rates,
+        runs_per_release=runs_per_release,
+        releases_per_year=releases_per_year,
+        rate_multipliers=[rate_multiplier],
+        include_curves=False,
+    )
+    # Months until automation pays off, rows are runs, columns are cadences
+    payback = sweep.payback_months[:, :, 0, 0]
+    text = np.where(np.isnan(payback), "never", np.char.mod("%.1f", np.nan_to_num(payback)))
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=payback,
+            x=[str(c) for c in releases_per_year],
+            y=[str(r) for r in runs_per_release],
+            text=text,
+            texttemplate="%{text}",
+            colorscale="RdYlGn_r",
+            colorbar=dict(title="Months"),
+            hovertemplate="Releases/year: %{x}<br>Runs/release: %{y}<br>Break-even: %{text} months<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title="Months to Break-even by Release Cadence and Runs per Release",
+        xaxis_title="Releases per year",
+        yaxis_title="Runs per release",
+        xaxis_type="category",
+        yaxis_type="category",
+        margin=dict(t=60),
+    )
+    return fig
+
+
+def roi_fan_chart_graph(
+    data_frame: pd.DataFrame,
+    testers_df: pd.DataFrame,
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+    n_samples: int = 500,
+    spread: float = 0.25,
+    seed: Optional[int] = 42,
+    progress: Optional[Callable[[float], None]] = None,
+):
+    import plotly.graph_objects as go
+
+    rates = average_hourly_rate(testers_df)
+    result = roi_monte_carlo(
+        data_frame,
+        rates,
+        runs_per_release,
+        releases,
+        releases_per_year,
+        n_samples=n_samples,
+        spread=spread,
+        seed=seed,
+        progress=progress,
+    )
+
+    # The band edges share their points, so the fill between them lines up
+    rows = downsample_indices(result.roi_p10, result.roi_p50, result.roi_p90)
+    x = result.releases[rows]
+
+    fig = go.Figure()
+    fig.add_trace(
+        _line_trace(x, result.roi_p90[rows], "P90", mode="lines", line=dict(width=0), showlegend=False)
+    )
+    fig.add_trace(
+        _line_trace(
+            x,
+            result.roi_p10[rows],
+            "P10 - P90",
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(99, 110, 250, 0.25)",
+        )
+    )
+    fig.add_trace(_line_trace(x, result.roi_p50[rows], "Median ROI", downsampled=len(x) < len(result.releases)))
+    fig.add_hline(y=0, line_dash="dash", line_color="grey")
+
+    fig.add_annotation(
+        x=releases,
+        y=result.roi_p50[-1],
+        text=f"P(break-even by release {releases}): {result.break_even_probability[-1]:.0%}",
+        showarrow=False,
+        yanchor="bottom",
+        xanchor="right",
+    )
+
+    fig.update_layout(
+        title=f"ROI Uncertainty ({n_samples} simulations, ±{spread:.0%} estimates)",
+        xaxis_title="Release",
+        yaxis_title="ROI (Rands)",
+        yaxis_tickprefix="R",
+        margin=dict(t=60),
+    )
+    return fig
+
+
+def roi_ranking_graph(
+    data_frame: pd.DataFrame,
+    testers_df: pd.DataFrame,
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+    top_n: int = 20,
+):
+    import plotly.graph_objects as go
+
+    rates = average_hourly_rate(testers_df)
+    ranked = rank_test_cases(data_frame, rates, runs_per_release, releases, releases_per_year, top_n=top_n)
+
+    # Fastest payback at the top
+    ranked = ranked.iloc[::-1]
+    fig = go.Figure(
+        go.Bar(
+            x=ranked["break_even_release"],
+            y=ranked["test_id"],
+            orientation="h",
+            customdata=np.column_stack([ranked["title"], ranked["roi"], ranked["initial_cost"]]),
+            text=[f"{r:.1f}" for r in ranked["break_even_release"]],
+            textposition="outside",
+            hovertemplate=(
+                "%{y}: %{customdata[0]}<br>Break-even: release %{x:.2f}"
+                "<br>Development cost: R%{customdata[2]:,.2f}"
+                f"<br>ROI after {releases} releases: R%{{customdata[1]:,.2f}}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        title=f"Top {len(ranked)} Test Cases by Fastest Payback",
+        xaxis_title="Break-even release",
+        yaxis_title="",
+        yaxis_type="category",
+        height=max(400, 24 * len(ranked) + 120),
+        margin=dict(t=60),
+    )
+    if ranked.empty:
+        fig.add_annotation(text="No automation candidate pays back", showarrow=False, x=0.5, y=0.5,
+                           xref="paper", yref="paper")
+    return fig
+
+
+def roi_trend_graph(trend: pd.DataFrame, suite: str):
+    # Draws a SnapshotStore.trend result: one point per saved upload
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(
+        _line_trace(
+            trend["taken_at"],
+            trend["break_even_release"],
+            "Break-even release",
+            customdata=np.column_stack([trend["row_count"], trend["candidate_count"]]),
+            hovertemplate=(
+                "%{x|%Y-%m-%d %H:%M}<br>Break-even: release %{y:.2f}"
+                "<br>%{customdata[0]} test cases, %{customdata[1]} candidates<extra></extra>"
+            ),
+        )
+    )
+    fig.add_trace(
+        _line_trace(
+            trend["taken_at"],
+            trend["final_roi"],
+            "ROI at horizon",
+            yaxis="y2",
+            hovertemplate="%{x|%Y-%m-%d %H:%M}<br>ROI: R%{y:,.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=f"ROI Trend: {suite} ({len(trend)} snapshots)",
+        xaxis_title="Uploaded",
+        yaxis=dict(title="Break-even release", rangemode="tozero"),
+        yaxis2=dict(title="ROI at horizon (Rands)", tickprefix="R", overlaying="y", side="right", showgrid=False),
+        legend=dict(orientation="h", y=-0.2),
+        margin=dict(t=60),
+    )
+    if trend.empty:
+        fig.add_annotation(text="No snapshots yet", showarrow=False, x=0.5, y=0.5, xref="paper", yref="paper")
+    return fig
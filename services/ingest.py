@@ -0,0 +1,167 @@
+import binascii
+import io
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.calculations import SuiteAggregate
+from services.validation import ValidationReport
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def decode_upload(contents: str) -> bytes:
+    # dcc.Upload contents are a data URL: "data:<type>;base64,<payload>"
+    content_type, content_string = contents.split(",", 1)
+    # a2b_base64 reads the ASCII str directly, b64decode would encode a bytes copy first
+    return binascii.a2b_base64(content_string)
+
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+TABLE_EXTENSIONS = (".csv", ".xls", ".xlsx") + PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+
+def read_table(
+    buffer: bytes,
+    filename: str,
+    dtypes: Optional[Dict] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    # Parse straight from the decoded bytes, there's no need for a decoded str copy
+    fn = filename.lower()
+    if fn.endswith(".csv"):
+        read = pd.read_csv
+    elif fn.endswith((".xls", ".xlsx")):
+        read = pd.read_excel
+    else:
+        read = None
+    if read is not None:
+        try:
+            return read(io.BytesIO(buffer), dtype=dtypes)
+        except ValueError:
+            if not dtypes:
+                raise
+        # Text in a numeric column: read again with the numeric types inferred, so
+        # only the offending columns stay text, for services.validation to report
+        return read(io.BytesIO(buffer), dtype=_text_dtypes(dtypes))
+    if fn.endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS):
+        return read_arrow_table(buffer, filename, dtypes, columns)
+    raise ValueError("Unsupported file type. Please upload .csv, .xlsx, .parquet or .arrow")
+
+
+def _text_dtypes(dtypes: Dict) -> Dict:
+    return {column: dtype for column, dtype in dtypes.items() if not _is_numeric(dtype)}
+
+
+def _is_numeric(dtype) -> bool:
+    return dtype is not str and np.issubdtype(np.dtype(dtype), np.number)
+
+
+def read_arrow_table(
+    buffer: bytes,
+    filename: str,
+    dtypes: Optional[Dict] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Parquet and Arrow IPC (Feather v2) files, read with pyarrow from the
+    upload bytes without a text parsing step. Only `columns` are read:
+    Parquet never decodes the others, Arrow IPC buffers are referenced in
+    place rather than copied. Columns are cast to the dtypes the CSV reader
+    would produce. Missing columns are left for validate_columns to report.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ValueError("Parquet and Arrow uploads need pyarrow installed") from e
+
+    source = pa.py_buffer(buffer)
+    if filename.lower().endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(pa.BufferReader(source))
+        available = parquet_file.schema_arrow.names
+        table = parquet_file.read(columns=[c for c in columns if c in available] if columns else None)
+    else:
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_stream(source).read_all()
+        if columns:
+            table = table.select([c for c in columns if c in table.column_names])
+
+    for column, dtype in (dtypes or {}).items():
+        if column in table.column_names:
+            target = pa.string() if dtype is str else pa.from_numpy_dtype(np.dtype(dtype))
+            values = table.column(column)
+            try:
+                values = values.cast(target)
+            except pa.ArrowInvalid:
+                # Text in a numeric column, left as text for services.validation to
+                # report. Anything else is a ValueError, like the CSV reader's
+                if not _is_numeric(dtype):
+                    raise
+                values = values.cast(pa.string())
+            table = table.set_column(table.column_names.index(column), column, values)
+    # split_blocks leaves numeric columns without nulls as views of the Arrow buffers
+    return table.to_pandas(split_blocks=True)
+
+
+def validate_columns(df: pd.DataFrame, columns: Sequence[str]) -> None:
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Columns does not match the example.csv: {missing}")
+
+
+def read_csv_header(buffer: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(buffer), nrows=0)
+
+
+def iter_csv_chunks(
+    buffer: bytes,
+    columns: Sequence[str],
+    dtypes: Optional[Dict] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    # Only the schema columns are materialised, at most chunk_rows at a time
+    yield from pd.read_csv(
+        io.BytesIO(buffer), usecols=list(columns), dtype=dtypes, chunksize=chunk_rows
+    )
+
+
+def aggregate_csv(
+    buffer: bytes,
+    columns: Sequence[str],
+    dtypes: Optional[Dict] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    head_rows: int = 10,
+    validator: Optional[Callable] = None,
+) -> Tuple[pd.DataFrame, SuiteAggregate, Optional[ValidationReport]]:
+    """
+    Folds every chunk of a test-case CSV into a SuiteAggregate without ever
+    holding the whole frame, returns the first head_rows rows for previews.
+    With a validator (see services.validation) numeric columns are parsed
+    leniently and each chunk is checked and coerced before it's folded in,
+    the chunks' reports are merged into one for the whole file (None
+    without a validator).
+    """
+    head = None
+    aggregate = SuiteAggregate()
+    report = None
+    if validator is not None and dtypes:
+        dtypes = _text_dtypes(dtypes)
+    for chunk in iter_csv_chunks(buffer, columns, dtypes, chunk_rows):
+        if validator is not None:
+            chunk, chunk_report = validator(chunk)
+            report = chunk_report if report is None else report.merge(chunk_report)
+        if head is None:
+            head = chunk.head(head_rows).copy()
+        aggregate = aggregate.merge(SuiteAggregate.from_frame(chunk))
+    if head is None:
+        head = pd.DataFrame(columns=list(columns))
+    if validator is not None and report is None:
+        # No data rows at all
+        report = validator(head)[1]
+    return head, aggregate, report
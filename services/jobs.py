@@ -0,0 +1,207 @@
+import contextvars
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+
+ABANDONED_JOB_SECONDS = 24 * 3600
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobStatus:
+    state: str  # queued, running, done, failed, cancelled or unknown
+    progress: float = 0.0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "failed", "cancelled", "unknown")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    Runs heavy callback work off the request thread, with no broker.
+    Callbacks submit a job and return straight away, a dcc.Interval then
+    polls status() until the result is ready.
+
+    Jobs run on a thread pool in the submitting process, but their state,
+    progress and result live in a local SQLite file (WAL mode), so every
+    worker process pointed at the same file can poll or cancel any job.
+    Results are stored as Dash/Plotly JSON and come back as plain dicts,
+    which Dash renders like the components they were built from.
+
+    Jobs receive a report(progress, message) function as first argument.
+    Cancellation is cooperative: once a job is cancelled, from any worker,
+    its next report() call raises JobCancelled. Jobs whose process died are
+    reported as failed. Finished jobs are kept for retain_seconds so a
+    poller can still collect them.
+    """
+
+    def __init__(self, path: Union[str, Path], max_workers: int = 2, retain_seconds: float = 600.0):
+        self.path = Path(path)
+        self.retain_seconds = retain_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qalculator-job")
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._host = socket.gethostname()
+        # Create the file now, rather than in the first request
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def submit(self, fn: Callable[..., Any], *args, replaces: Optional[str] = None, **kwargs) -> str:
+        if replaces:
+            self.cancel(replaces)
+        self._forget_expired()
+
+        job_id = uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT INTO jobs (id, state, message, host, pid, created_at) VALUES (?, 'queued', 'Queued', ?, ?, ?)",
+            (job_id, self._host, os.getpid(), time.time()),
+        )
+        # Run in a copy of the caller's context, so context variables (like the
+        # callback a job is attributed to in services.metrics) carry over
+        future = self._executor.submit(contextvars.copy_context().run, self._run, job_id, fn, args, kwargs)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget_future(job_id))
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args, kwargs) -> None:
+        from plotly.io.json import to_json_plotly
+
+        def report(progress: float, message: str = "") -> None:
+            # Called by the job itself, doubles as its cancellation checkpoint
+            updated = self._connection().execute(
+                "UPDATE jobs SET state = 'running', progress = ?, message = ? WHERE id = ? AND cancelled = 0",
+                (min(max(progress, 0.0), 1.0), message, job_id),
+            ).rowcount
+            if not updated:
+                raise JobCancelled()
+
+        try:
+            report(0.0, "Running")
+            # Serialised here, so a slow or unserialisable result fails the job
+            result = to_json_plotly(list(fn(report, *args, **kwargs)))
+        except JobCancelled:
+            self._finish(job_id, "cancelled", message="Cancelled")
+        except Exception as e:
+            self._finish(job_id, "failed", error=str(e))
+        else:
+            self._finish(job_id, "done", message="Done", result=result)
+
+    def _finish(self, job_id: str, state: str, message: Optional[str] = None,
+                result: Optional[str] = None, error: Optional[str] = None) -> None:
+        self._connection().execute(
+            "UPDATE jobs SET state = ?, progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END,"
+            " message = COALESCE(?, message), result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (state, state, message, result, error, time.time(), job_id),
+        )
+
+    def cancel(self, job_id: str) -> None:
+        self._connection().execute(
+            "UPDATE jobs SET cancelled = 1 WHERE id = ? AND finished_at IS NULL", (job_id,)
+        )
+        with self._lock:
+            future = self._futures.get(job_id)
+        # Only stops jobs still queued here, running ones stop at their next report()
+        if future is not None and future.cancel():
+            self._finish(job_id, "cancelled", message="Cancelled")
+
+    def status(self, job_id: Optional[str]) -> JobStatus:
+        row = None
+        if job_id:
+            row = self._connection().execute(
+                "SELECT state, progress, message, result, error, cancelled, host, pid FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return JobStatus("unknown")
+
+        state, progress, message, result, error, cancelled, host, pid = row
+        if state in ("queued", "running"):
+            if cancelled:
+                return JobStatus("cancelled", progress, "Cancelled")
+            if host == self._host and not _pid_alive(pid):
+                return JobStatus("failed", progress, message, error="The worker running this job stopped")
+            return JobStatus(state, progress, message)
+        if state == "done":
+            return JobStatus("done", 1.0, message, result=json.loads(result))
+        return JobStatus(state, progress, message, error=error)
+
+    def pop(self, job_id: Optional[str]) -> JobStatus:
+        # Like status(), but forgets the job once it has finished
+        status = self.status(job_id)
+        if status.finished and status.state != "unknown":
+            self._connection().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return status
+
+    def shutdown(self) -> None:
+        with self._lock:
+            job_ids = list(self._futures)
+        for job_id in job_ids:
+            self.cancel(job_id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _forget_future(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _forget_expired(self) -> None:
+        # Jobs of a worker that died never finish, they go after a day
+        now = time.time()
+        self._connection().execute(
+            "DELETE FROM jobs WHERE finished_at < ? OR created_at < ?",
+            (now - self.retain_seconds, now - ABANDONED_JOB_SECONDS),
+        )
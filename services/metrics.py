@@ -0,0 +1,229 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dash.exceptions import PreventUpdate
+from flask import Flask, Response, has_request_context, request
+
+logger = logging.getLogger("qalculator.metrics")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+Labels = Tuple[str, str]  # (callback, output)
+
+# The callback a piece of work runs for, set by the instrumented callback and
+# carried into background jobs (JobManager runs jobs in a copy of the context).
+_current: ContextVar[Optional[Tuple["Metrics", Labels]]] = ContextVar("qalculator_callback", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Times a sub-phase ("pandas", "plotly", ...) of the callback being served.
+    A no-op outside instrumented callbacks.
+    """
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics, labels = current
+        metrics.observe_phase(labels, name, time.perf_counter() - start)
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield ("+Inf" if bound == float("inf") else repr(bound)), total
+
+
+class _CallbackStats:
+    def __init__(self):
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.request_bytes = _Histogram(BYTES_BUCKETS)
+        self.response_bytes = _Histogram(BYTES_BUCKETS)
+        self.errors = 0
+        self.prevented = 0
+        self.phases: Dict[str, float] = {}
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def callback_labels(output_key: str, fn: Callable) -> Labels:
+    # callback_map keys look like "..tab-content.children@<hash>...graph-job-store.data@<hash>.."
+    first_output = output_key.strip(".").split("...")[0].split("@")[0]
+    name = getattr(fn, "__wrapped__", fn).__name__
+    return name, first_output
+
+
+class Metrics:
+    """
+    In-process metrics for the Dash callbacks: wall time, request/response
+    payload bytes and errors per callback, time spent in named sub-phases
+    (see ``phase``) and the hit rates of registered caches. ``render`` gives
+    the Prometheus text format served on /metrics.
+
+    Callbacks slower than slow_callback_seconds are logged as warnings.
+    """
+
+    def __init__(self, slow_callback_seconds: Optional[float] = None):
+        self.slow_callback_seconds = slow_callback_seconds
+        self._callbacks: Dict[Labels, _CallbackStats] = {}
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def instrument_dash(self, app) -> None:
+        # Dash stores the wrapped callable it dispatches to in callback_map,
+        # wrapping it there covers every callback registered so far.
+        # Clientside callbacks have no entry to wrap, they never reach the server.
+        for output_key, entry in app.callback_map.items():
+            fn = entry.get("callback")
+            if fn is None or getattr(fn, "_instrumented", False):
+                continue
+            entry["callback"] = self.wrap(fn, callback_labels(output_key, fn))
+
+    def wrap(self, fn: Callable, labels: Labels) -> Callable:
+        def instrumented(*args, **kwargs):
+            token = _current.set((self, labels))
+            request_bytes = (request.content_length or 0) if has_request_context() else 0
+            start = time.perf_counter()
+            response, error, prevented = None, False, False
+            try:
+                response = fn(*args, **kwargs)
+                return response
+            except PreventUpdate:
+                prevented = True
+                raise
+            except Exception:
+                error = True
+                raise
+            finally:
+                seconds = time.perf_counter() - start
+                _current.reset(token)
+                response_bytes = len(response) if isinstance(response, (str, bytes)) else 0
+                self.observe_callback(labels, seconds, request_bytes, response_bytes, error, prevented)
+
+        instrumented._instrumented = True
+        instrumented.__wrapped__ = fn
+        return instrumented
+
+    def track_cache(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        # stats() must return at least hits, misses and entries, like FigureCache.stats
+        with self._lock:
+            self._caches[name] = stats
+
+    def observe_callback(self, labels: Labels, seconds: float, request_bytes: int, response_bytes: int,
+                         error: bool = False, prevented: bool = False) -> None:
+        with self._lock:
+            stats = self._callbacks.setdefault(labels, _CallbackStats())
+            stats.duration.observe(seconds)
+            stats.request_bytes.observe(request_bytes)
+            stats.response_bytes.observe(response_bytes)
+            stats.errors += error
+            stats.prevented += prevented
+            phases = dict(stats.phases)
+
+        if self.slow_callback_seconds is not None and seconds >= self.slow_callback_seconds:
+            logger.warning(
+                "Slow callback %s (%s) took %.3fs, request %d bytes, response %d bytes, phase totals %s",
+                labels[0], labels[1], seconds, request_bytes, response_bytes,
+                {k: round(v, 3) for k, v in phases.items()},
+            )
+
+    def observe_phase(self, labels: Labels, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._callbacks.setdefault(labels, _CallbackStats())
+            stats.phases[name] = stats.phases.get(name, 0.0) + seconds
+
+    def render(self) -> str:
+        with self._lock:
+            callbacks = sorted(self._callbacks.items())
+            caches = sorted(self._caches.items())
+            lines: List[str] = []
+
+            def histogram(metric: str, help_text: str, pick: Callable[[_CallbackStats], _Histogram]):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for (callback, output), stats in callbacks:
+                    hist = pick(stats)
+                    for le, count in hist.cumulative():
+                        lines.append(f"{metric}_bucket{_labels(callback=callback, output=output, le=le)} {count}")
+                    lines.append(f"{metric}_sum{_labels(callback=callback, output=output)} {hist.sum}")
+                    lines.append(f"{metric}_count{_labels(callback=callback, output=output)} {hist.count}")
+
+            histogram("qalculator_callback_duration_seconds", "Wall time of Dash callbacks.",
+                      lambda s: s.duration)
+            histogram("qalculator_callback_request_bytes", "Size of callback request bodies (inputs and state).",
+                      lambda s: s.request_bytes)
+            histogram("qalculator_callback_response_bytes", "Size of serialized callback responses.",
+                      lambda s: s.response_bytes)
+
+            lines.append("# HELP qalculator_callback_errors_total Callbacks that raised an error.")
+            lines.append("# TYPE qalculator_callback_errors_total counter")
+            for (callback, output), stats in callbacks:
+                lines.append(f"qalculator_callback_errors_total{_labels(callback=callback, output=output)} {stats.errors}")
+
+            lines.append("# HELP qalculator_callback_prevented_total Callbacks that raised PreventUpdate.")
+            lines.append("# TYPE qalculator_callback_prevented_total counter")
+            for (callback, output), stats in callbacks:
+                lines.append(
+                    f"qalculator_callback_prevented_total{_labels(callback=callback, output=output)} {stats.prevented}"
+                )
+
+            lines.append("# HELP qalculator_callback_phase_seconds_total Time spent in callback sub-phases,"
+                         " including background jobs the callback started.")
+            lines.append("# TYPE qalculator_callback_phase_seconds_total counter")
+            for (callback, output), stats in callbacks:
+                for name, seconds in sorted(stats.phases.items()):
+                    labels = _labels(callback=callback, output=output, phase=name)
+                    lines.append(f"qalculator_callback_phase_seconds_total{labels} {seconds}")
+
+        cache_stats = [(name, stats()) for name, stats in caches]
+        for metric, key, kind, help_text in (
+            ("qalculator_cache_hits_total", "hits", "counter", "Cache lookups that found an entry."),
+            ("qalculator_cache_misses_total", "misses", "counter", "Cache lookups that found no entry."),
+            ("qalculator_cache_hit_ratio", "hit_rate", "gauge", "Hits over lookups since start."),
+            ("qalculator_cache_entries", "entries", "gauge", "Entries currently cached."),
+            ("qalculator_cache_bytes", "bytes", "gauge", "Memory held by cached entries."),
+        ):
+            rows = [(name, stats[key]) for name, stats in cache_stats if key in stats]
+            if not rows:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{metric}{_labels(cache=name)} {value}" for name, value in rows)
+
+        return "\n".join(lines) + "\n"
+
+
+def register_metrics_endpoint(server: Flask, metrics: Metrics, path: str = "/metrics") -> None:
+    @server.route(path, methods=["GET"])
+    def prometheus_metrics():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,211 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.calculations import SuiteAggregate, candidate_masks
+from services.scenarios import break_even_release
+
+# Uncertain per-row estimates, sampled around the value given in the upload
+SAMPLED_COLUMNS = ("dev_time_hours", "exec_time_sec", "maintenance_pct_per_month")
+
+# Upper bound on samples x rows drawn at once, keeps a chunk around 100MB
+MAX_CHUNK_CELLS = 4_000_000
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    releases: np.ndarray
+    roi_p10: np.ndarray
+    roi_p50: np.ndarray
+    roi_p90: np.ndarray
+    break_even_probability: np.ndarray
+    break_even_p10: float
+    break_even_p50: float
+    break_even_p90: float
+    n_samples: int
+    seed: Optional[int]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "release": self.releases,
+            "roi_p10": self.roi_p10,
+            "roi_p50": self.roi_p50,
+            "roi_p90": self.roi_p90,
+            "break_even_probability": self.break_even_probability,
+        })
+
+
+def _triangular_offsets(rng: np.random.Generator, shape) -> np.ndarray:
+    # Symmetric triangular on [-1, 1] by inverse CDF, unlike Generator.triangular
+    # this also copes with zero-width distributions (values of 0).
+    u = rng.random(shape)
+    return np.where(u < 0.5, np.sqrt(2.0 * u) - 1.0, 1.0 - np.sqrt(2.0 * (1.0 - u)))
+
+
+def _sample_chunk_totals(values: np.ndarray, n_samples: int, spread: float, seed) -> np.ndarray:
+    """
+    values is (rows, len(SAMPLED_COLUMNS)). Each row value v is drawn from a
+    triangular distribution on [v * (1 - spread), v * (1 + spread)] with mode v,
+    returns the per-sample column totals shaped (n_samples, len(SAMPLED_COLUMNS)).
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.empty((n_samples, values.shape[1]))
+    for j in range(values.shape[1]):
+        offsets = _triangular_offsets(rng, (n_samples, values.shape[0]))
+        # sum(v * (1 + spread * t)) == sum(v) + spread * (t @ v)
+        totals[:, j] = values[:, j].sum() + spread * (offsets @ values[:, j])
+    return totals
+
+
+_pools: Dict[Optional[int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _process_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    # One long-lived pool per size, shared by every run. Runs are started from
+    # job threads of a threaded server, where forking could copy a lock held by
+    # another thread, so workers are spawned instead.
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[max_workers] = pool
+        return pool
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def _sampled_totals(
+    values: np.ndarray,
+    n_samples: int,
+    spread: float,
+    seed: Optional[int],
+    max_workers: Optional[int],
+    parallel_min_rows: int,
+    progress: Optional[Callable[[float], None]] = None,
+) -> np.ndarray:
+    chunk_rows = max(1, MAX_CHUNK_CELLS // n_samples)
+    starts = range(0, len(values), chunk_rows)
+    # One child seed per chunk, so results don't depend on the number of workers
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    chunks = [values[start:start + chunk_rows] for start in starts]
+
+    totals = np.zeros((n_samples, values.shape[1]))
+    if len(chunks) > 1 and len(values) >= parallel_min_rows and max_workers != 1:
+        pool = _process_pool(max_workers)
+        futures = [
+            pool.submit(_sample_chunk_totals, chunk, n_samples, spread, chunk_seed)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        ]
+        try:
+            # Summed in chunk order, so the result doesn't depend on scheduling
+            for done, future in enumerate(futures, start=1):
+                totals += future.result()
+                if progress is not None:
+                    progress(done / len(chunks))
+        except BrokenProcessPool:
+            # A worker died, the next run starts a fresh pool
+            with _pools_lock:
+                if _pools.get(max_workers) is pool:
+                    del _pools[max_workers]
+            raise
+        except BaseException:
+            # e.g. progress raising JobCancelled: drop the chunks not started yet
+            # rather than keeping the CPUs busy for a result nobody reads
+            for future in futures:
+                future.cancel()
+            raise
+    else:
+        for done, (chunk, chunk_seed) in enumerate(zip(chunks, seeds), start=1):
+            totals += _sample_chunk_totals(chunk, n_samples, spread, chunk_seed)
+            if progress is not None:
+                progress(done / len(chunks))
+    return totals
+
+
+def roi_monte_carlo(
+    data_frame: pd.DataFrame,
+    average_hourly_rate: Dict[str, float],
+    runs_per_release_global: int,
+    releases: int,
+    releases_per_year: float,
+    n_samples: int = 1000,
+    spread: float = 0.25,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    parallel_min_rows: int = 200_000,
+    progress: Optional[Callable[[float], None]] = None,
+) -> MonteCarloResult:
+    """
+    Monte Carlo version of roi_over_time. dev_time_hours, exec_time_sec and
+    maintenance_pct_per_month of every automation candidate are sampled from a
+    triangular distribution +/- spread around the given value, the rest of the
+    model is the deterministic one.
+
+    Rows are sampled in chunks, suites with at least parallel_min_rows candidates
+    spread the chunks over a long-lived process pool. The same seed gives the
+    same result. If progress raises (a cancelled job), chunks not yet started
+    are cancelled.
+    progress, when given, is called with the fraction of chunks done.
+    """
+    if not 0 <= spread <= 1:
+        raise ValueError("spread must be between 0 and 1")
+    if n_samples < 1:
+        raise ValueError("n_samples must be >= 1")
+
+    aggregate = SuiteAggregate.from_frame(data_frame)
+    _, candidates = candidate_masks(data_frame)
+    values = data_frame.loc[candidates, list(SAMPLED_COLUMNS)].fillna(0).to_numpy(dtype=float)
+
+    totals = _sampled_totals(values, n_samples, spread, seed, max_workers, parallel_min_rows, progress)
+    dev_hours, exec_seconds, maintenance_pct = totals.T
+
+    total_runs = aggregate.total_runs(runs_per_release_global)
+    manual_cost_per_release = (
+        aggregate.manual_minutes / 60.0 * average_hourly_rate["manual_rate"] * total_runs
+    )
+    automation_rate = average_hourly_rate["automation_rate"]
+    initial_cost = dev_hours * automation_rate
+    run_cost_per_release = exec_seconds / 3600.0 * automation_rate * total_runs
+    maintenance_fraction = maintenance_pct / max(aggregate.candidate_count, 1) / 100.0
+    months_per_release = 12.0 / max(releases_per_year, 1.0)
+    maintenance_cost_per_release = initial_cost * maintenance_fraction * months_per_release
+
+    net_saving = manual_cost_per_release - run_cost_per_release - maintenance_cost_per_release
+
+    releases_arr = np.arange(1, releases + 1)
+    roi = net_saving[:, None] * releases_arr - initial_cost[:, None]
+    p10, p50, p90 = np.percentile(roi, [10, 50, 90], axis=0)
+
+    be = break_even_release(initial_cost, net_saving)
+    # NaN (never pays off) compares False, so it counts as not broken even
+    break_even_probability = (be[:, None] <= releases_arr).mean(axis=0)
+    be_p10, be_p50, be_p90 = np.percentile(
+        np.where(np.isnan(be), np.inf, be), [10, 50, 90], method="inverted_cdf"
+    )
+
+    return MonteCarloResult(
+        releases=releases_arr,
+        roi_p10=p10,
+        roi_p50=p50,
+        roi_p90=p90,
+        break_even_probability=break_even_probability,
+        break_even_p10=float(be_p10),
+        break_even_p50=float(be_p50),
+        break_even_p90=float(be_p90),
+        n_samples=n_samples,
+        seed=seed,
+    )
@@ -0,0 +1,198 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.calculations import roi_over_time
+from services.ranking import per_test_roi
+
+SOLVERS = ("auto", "dp", "greedy")
+
+# The DP table holds one bool per (candidate, budget step): 50M cells is ~50MB
+MAX_DP_CELLS = 50_000_000
+
+
+@dataclass(frozen=True)
+class PortfolioSelection:
+    """
+    The candidates to automate within a budget of developer hours.
+
+    roi is the selection's ROI after `releases` releases in the per-test
+    model the optimiser maximises (services.ranking.per_test_roi),
+    upper_bound an ROI no selection within the budget can beat: equal to roi
+    for the exact solver, the fractional-knapsack bound for the greedy one.
+
+    roi_df and the break-even are roi_over_time of the selected rows, what
+    /api/roi reports for a suite of just those tests. Both break-even
+    values are None when nothing is selected.
+    """
+    method: str
+    budget_hours: float
+    selected: pd.DataFrame
+    dev_hours: float
+    roi: float
+    upper_bound: float
+    roi_df: pd.DataFrame
+    break_even_release: Optional[float]
+    break_even_cost: Optional[float]
+    solve_seconds: float
+
+
+def _solve_dp(weights: np.ndarray, values: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    Exact 0/1 knapsack over integer weights, O(n * capacity) time and
+    n * capacity bytes of memory. Each item is one vectorized pass over the
+    budget axis.
+    """
+    n = len(values)
+    best = np.zeros(capacity + 1)
+    take = np.zeros((n, capacity + 1), dtype=bool)
+    for i in range(n):
+        w = weights[i]
+        if w > capacity:
+            continue
+        # Right-hand side reads the previous row, so each item is used at most once
+        with_item = best[:capacity + 1 - w] + values[i]
+        improved = with_item > best[w:]
+        take[i, w:] = improved
+        best[w:] = np.where(improved, with_item, best[w:])
+
+    chosen = []
+    c = capacity
+    for i in range(n - 1, -1, -1):
+        if take[i, c]:
+            chosen.append(i)
+            c -= weights[i]
+    return np.array(chosen[::-1], dtype=np.intp)
+
+
+def _solve_greedy(weights: np.ndarray, values: np.ndarray, capacity: float) -> Tuple[np.ndarray, float]:
+    """
+    Greedy by ROI per hour, O(n log n). The better of the greedy fill and the
+    single most valuable item that fits is at least half the optimum. Also
+    returns the fractional-knapsack bound on the optimum.
+    """
+    order = np.argsort(-(values / weights), kind="stable")
+    cumulative = np.cumsum(weights[order])
+
+    # Everything up to the first item that doesn't fit, then keep filling with
+    # the smaller items further down the order
+    prefix = int(np.searchsorted(cumulative, capacity, side="right"))
+    chosen = list(order[:prefix])
+    remaining = capacity - (cumulative[prefix - 1] if prefix else 0.0)
+    if prefix < len(order):
+        fraction = remaining / weights[order[prefix]]
+        upper_bound = values[order[:prefix]].sum() + fraction * values[order[prefix]]
+        rest = order[prefix + 1:]
+        smallest = np.minimum.accumulate(weights[rest][::-1])[::-1] if len(rest) else rest
+        for k, i in enumerate(rest):
+            if smallest[k] > remaining:
+                break
+            if weights[i] <= remaining:
+                chosen.append(i)
+                remaining -= weights[i]
+    else:
+        upper_bound = values.sum()
+
+    chosen = np.array(chosen, dtype=np.intp)
+    fits = np.flatnonzero(weights <= capacity)
+    if len(fits):
+        best_single = fits[np.argmax(values[fits])]
+        if values[best_single] > values[chosen].sum():
+            chosen = np.array([best_single], dtype=np.intp)
+    return chosen, float(upper_bound)
+
+
+def optimise_portfolio(
+    data_frame: pd.DataFrame,
+    rates: Dict[str, float],
+    budget_hours: float,
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+    method: str = "auto",
+    resolution_hours: float = 0.01,
+    max_dp_cells: int = MAX_DP_CELLS,
+) -> PortfolioSelection:
+    """
+    Picks the automation candidates that maximise ROI after `releases`
+    releases, with their dev_time_hours adding up to at most budget_hours.
+
+    method="dp" is exact when dev hours are multiples of resolution_hours
+    (they are rounded up otherwise) and runs in
+    O(candidates * budget_hours / resolution_hours). method="greedy" runs in
+    O(candidates log candidates) and is within a factor 2 of the optimum, in
+    practice within a fraction of a percent on large suites (see upper_bound).
+    "auto" uses the DP when its table fits in max_dp_cells.
+    """
+    if method not in SOLVERS:
+        raise ValueError(f"method must be one of {SOLVERS}, got {method!r}")
+    if not budget_hours >= 0:
+        raise ValueError("budget_hours must be >= 0")
+
+    start = time.perf_counter()
+    per_test = per_test_roi(data_frame, rates, runs_per_release, releases, releases_per_year)
+
+    # Only candidates that gain something are worth budget, free ones are always taken
+    items = np.flatnonzero(per_test["candidate"] & (per_test["roi"] > 0))
+    weights = per_test["dev_hours"][items]
+    values = per_test["roi"][items]
+    free = weights <= 0
+    paid_items, paid_weights, paid_values = items[~free], weights[~free], values[~free]
+
+    # Rounding up keeps the selection within budget, but is only exact
+    # when every estimate is a multiple of resolution_hours
+    units = np.ceil(paid_weights / resolution_hours - 1e-9).astype(np.intp)
+    # Budget beyond what all paid candidates cost together changes nothing,
+    # so a huge budget doesn't size the DP table
+    capacity = int(math.floor(min(budget_hours / resolution_hours + 1e-9, float(units.sum()))))
+    cells = len(paid_items) * (capacity + 1)
+    if method == "auto":
+        method = "dp" if len(paid_items) and cells <= max_dp_cells else "greedy"
+
+    chosen, upper_bound = _solve_greedy(paid_weights, paid_values, float(budget_hours))
+    if method == "dp" and len(paid_items):
+        if cells > max_dp_cells:
+            raise ValueError(
+                f"DP table of {len(paid_items)} candidates x {capacity + 1} budget steps exceeds"
+                f" {max_dp_cells} cells, use method='greedy' or a coarser resolution_hours"
+            )
+        exact_chosen = _solve_dp(units, paid_values, capacity)
+        if np.allclose(units * resolution_hours, paid_weights):
+            upper_bound = float(paid_values[exact_chosen].sum())
+        if paid_values[exact_chosen].sum() >= paid_values[chosen].sum():
+            chosen = exact_chosen
+
+    rows = np.sort(np.concatenate([items[free], paid_items[chosen]]))
+    upper_bound += float(values[free].sum())
+    solve_seconds = time.perf_counter() - start
+
+    roi_df, break_even_release, break_even_cost = roi_over_time(
+        data_frame.iloc[rows], rates, runs_per_release, releases, releases_per_year
+    )
+    if not len(rows):
+        # Nothing to automate, nothing to break even on
+        break_even_release = break_even_cost = None
+
+    selected = pd.DataFrame({
+        "test_id": data_frame["test_id"].to_numpy()[rows],
+        "title": data_frame["title"].to_numpy()[rows],
+        "dev_time_hours": per_test["dev_hours"][rows],
+        "roi": per_test["roi"][rows],
+        "break_even_release": per_test["break_even_release"][rows],
+    })
+    return PortfolioSelection(
+        method=method,
+        budget_hours=float(budget_hours),
+        selected=selected,
+        dev_hours=float(per_test["dev_hours"][rows].sum()),
+        roi=float(per_test["roi"][rows].sum()),
+        upper_bound=upper_bound,
+        roi_df=roi_df,
+        break_even_release=break_even_release,
+        break_even_cost=break_even_cost,
+        solve_seconds=solve_seconds,
+    )
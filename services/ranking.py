@@ -0,0 +1,109 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from services.calculations import candidate_masks
+from services.scenarios import break_even_release
+
+RANK_BY = ("break_even", "roi")
+
+# Per-row estimates the ROI of a single test case depends on
+ROW_COLUMNS = ("manual_time_min", "dev_time_hours", "exec_time_sec", "maintenance_pct_per_month")
+
+
+def per_test_roi(
+    data_frame: pd.DataFrame,
+    rates: Dict[str, float],
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+) -> Dict[str, np.ndarray]:
+    """
+    The linear ROI model of roi_over_time, evaluated per test case in one
+    vectorized pass. Each case runs runs_per_release_override times per
+    release when it has one, runs_per_release times otherwise, and is
+    maintained at its own maintenance_pct_per_month.
+
+    Returns per-row arrays; break_even_release is NaN for cases that never pay
+    off and for cases that aren't automation candidates.
+    """
+    _, candidates = candidate_masks(data_frame)
+    manual_minutes, dev_hours, exec_seconds, maintenance_pct = (
+        data_frame[list(ROW_COLUMNS)].fillna(0).to_numpy(dtype=float).T
+    )
+    overrides = pd.to_numeric(data_frame["runs_per_release_override"], errors="coerce")
+    overrides = overrides.to_numpy(dtype=np.float64, na_value=np.nan)
+    runs = np.where(overrides > 0, overrides, float(runs_per_release))
+
+    manual_rate = rates["manual_rate"]
+    automation_rate = rates["automation_rate"]
+    months_per_release = 12.0 / max(releases_per_year, 1.0)
+
+    initial_cost = dev_hours * automation_rate
+    manual_cost = manual_minutes / 60.0 * manual_rate * runs
+    run_cost = exec_seconds / 3600.0 * automation_rate * runs
+    maintenance_cost = initial_cost * maintenance_pct / 100.0 * months_per_release
+    net_saving = manual_cost - run_cost - maintenance_cost
+
+    break_even = np.where(candidates & (net_saving > 0), break_even_release(initial_cost, net_saving), np.nan)
+    return {
+        "candidate": candidates,
+        "runs_per_release": runs,
+        "dev_hours": dev_hours,
+        "initial_cost": initial_cost,
+        "manual_cost_per_release": manual_cost,
+        "run_cost_per_release": run_cost,
+        "maintenance_cost_per_release": maintenance_cost,
+        "net_saving_per_release": net_saving,
+        "break_even_release": break_even,
+        "roi": net_saving * releases - initial_cost,
+    }
+
+
+def top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n smallest finite values, in ascending order. Uses a
+    partial sort (argpartition) and only fully sorts the n selected rows.
+    """
+    finite = np.flatnonzero(np.isfinite(values))
+    n = min(n, len(finite))
+    if n == 0:
+        return finite[:0]
+    if n < len(finite):
+        finite = finite[np.argpartition(values[finite], n - 1)[:n]]
+    # Sort by value, ties by row order, so rankings are reproducible
+    return finite[np.lexsort((finite, values[finite]))]
+
+
+def rank_test_cases(
+    data_frame: pd.DataFrame,
+    rates: Dict[str, float],
+    runs_per_release: int = 1,
+    releases: int = 12,
+    releases_per_year: float = 12.0,
+    top_n: int = 20,
+    by: str = "break_even",
+) -> pd.DataFrame:
+    """
+    The top_n automation candidates that pay back fastest (by="break_even")
+    or return the most over the horizon of `releases` (by="roi").
+    """
+    if by not in RANK_BY:
+        raise ValueError(f"by must be one of {RANK_BY}, got {by!r}")
+    per_test = per_test_roi(data_frame, rates, runs_per_release, releases, releases_per_year)
+
+    if by == "break_even":
+        key = per_test["break_even_release"]
+    else:
+        key = np.where(per_test["candidate"], -per_test["roi"], np.nan)
+    rows = top_n_indices(key, top_n)
+
+    ranked = pd.DataFrame({
+        "rank": np.arange(1, len(rows) + 1),
+        "test_id": data_frame["test_id"].to_numpy()[rows],
+        "title": data_frame["title"].to_numpy()[rows],
+    })
+    for column in ("runs_per_release", "initial_cost", "net_saving_per_release", "break_even_release", "roi"):
+        ranked[column] = per_test[column][rows]
+    return ranked
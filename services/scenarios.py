@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.calculations import SuiteData, suite_aggregate
+
+
+def break_even_release(initial_cost, net_saving_per_release):
+    """
+    Closed-form break-even of roi(r) = r * net_saving_per_release - initial_cost.
+
+    Works element-wise on arrays, NaN where automation never pays off.
+    """
+    initial_cost = np.asarray(initial_cost, dtype=float)
+    net_saving_per_release = np.asarray(net_saving_per_release, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        release = np.where(
+            net_saving_per_release > 0, initial_cost / net_saving_per_release, np.nan
+        )
+    return np.where(initial_cost == 0, 0.0, release)
+
+
+@dataclass(frozen=True)
+class ScenarioSweep:
+    """
+    ROI results for the Cartesian grid of scenario parameters.
+
+    Grid arrays are shaped (runs, releases_per_year, rate_multipliers,
+    maintenance_pcts), curves add a trailing release axis.
+    """
+    runs_per_release: np.ndarray
+    releases_per_year: np.ndarray
+    rate_multipliers: np.ndarray
+    maintenance_pcts: np.ndarray
+    releases: np.ndarray
+    initial_cost: np.ndarray
+    net_saving_per_release: np.ndarray
+    break_even_release: np.ndarray
+    break_even_cost: np.ndarray
+    payback_months: np.ndarray
+    manual_cost: Optional[np.ndarray] = None
+    automation_cost: Optional[np.ndarray] = None
+    roi: Optional[np.ndarray] = None
+
+    @property
+    def shape(self):
+        return self.break_even_release.shape
+
+    def to_frame(self) -> pd.DataFrame:
+        # One row per scenario, handy for pivoting and filtering
+        grid = np.meshgrid(
+            self.runs_per_release,
+            self.releases_per_year,
+            self.rate_multipliers,
+            self.maintenance_pcts,
+            indexing="ij",
+        )
+        return pd.DataFrame({
+            "runs_per_release": grid[0].ravel(),
+            "releases_per_year": grid[1].ravel(),
+            "rate_multiplier": grid[2].ravel(),
+            "maintenance_pct_per_month": grid[3].ravel(),
+            "initial_cost": self.initial_cost.ravel(),
+            "net_saving_per_release": self.net_saving_per_release.ravel(),
+            "break_even_release": self.break_even_release.ravel(),
+            "break_even_cost": self.break_even_cost.ravel(),
+            "payback_months": self.payback_months.ravel(),
+        })
+
+
+def roi_scenario_sweep(
+    data_frame: SuiteData,
+    average_hourly_rate: Dict[str, float],
+    runs_per_release: Sequence[int] = (1,),
+    releases_per_year: Sequence[float] = (12.0,),
+    rate_multipliers: Sequence[float] = (1.0,),
+    maintenance_pcts: Optional[Sequence[float]] = None,
+    releases: int = 12,
+    include_curves: bool = True,
+) -> ScenarioSweep:
+    """
+    Evaluates roi_over_time for every combination of the given parameters
+    with NumPy broadcasting instead of one call per scenario.
+
+    rate_multipliers scale the automation hourly rate, maintenance_pcts are
+    %/month like the CSV column (defaults to the suite's own mean).
+    """
+    aggregate = suite_aggregate(data_frame)
+
+    runs = np.asarray(runs_per_release, dtype=float)
+    cadence = np.asarray(releases_per_year, dtype=float)
+    multipliers = np.asarray(rate_multipliers, dtype=float)
+    if maintenance_pcts is None:
+        maintenance_pcts = [aggregate.maintenance_pct * 100.0]
+    maintenance = np.asarray(maintenance_pcts, dtype=float)
+
+    # Broadcast each parameter along its own axis
+    runs_g = runs[:, None, None, None]
+    cadence_g = cadence[None, :, None, None]
+    multipliers_g = multipliers[None, None, :, None]
+    maintenance_g = maintenance[None, None, None, :] / 100.0
+
+    total_runs = np.maximum(
+        1.0, np.floor(aggregate.override_runs + aggregate.default_runs_rows * runs_g)
+    )
+    automation_rate = average_hourly_rate["automation_rate"] * multipliers_g
+
+    manual_cost_per_release = (
+        aggregate.manual_minutes / 60.0 * average_hourly_rate["manual_rate"] * total_runs
+    )
+    initial_cost = aggregate.candidate_dev_hours * automation_rate
+    run_cost_per_release = aggregate.candidate_exec_seconds / 3600.0 * automation_rate * total_runs
+    months_per_release = 12.0 / np.maximum(cadence_g, 1.0)
+    maintenance_cost_per_release = initial_cost * maintenance_g * months_per_release
+
+    net_saving = manual_cost_per_release - run_cost_per_release - maintenance_cost_per_release
+
+    shape = (len(runs), len(cadence), len(multipliers), len(maintenance))
+    manual_cost_per_release = np.broadcast_to(manual_cost_per_release, shape)
+    initial_cost = np.broadcast_to(initial_cost, shape)
+    net_saving = np.broadcast_to(net_saving, shape)
+    automation_cost_per_release = manual_cost_per_release - net_saving
+
+    be_release = break_even_release(initial_cost, net_saving)
+    be_cost = manual_cost_per_release * be_release
+    payback_months = be_release * np.broadcast_to(months_per_release, shape)
+
+    releases_arr = np.arange(1, releases + 1)
+    curves = {}
+    if include_curves:
+        k = releases_arr.astype(float)
+        curves["manual_cost"] = manual_cost_per_release[..., None] * k
+        curves["automation_cost"] = initial_cost[..., None] + automation_cost_per_release[..., None] * k
+        curves["roi"] = curves["manual_cost"] - curves["automation_cost"]
+
+    return ScenarioSweep(
+        runs_per_release=runs,
+        releases_per_year=cadence,
+        rate_multipliers=multipliers,
+        maintenance_pcts=maintenance,
+        releases=releases_arr,
+        initial_cost=np.array(initial_cost),
+        net_saving_per_release=np.array(net_saving),
+        break_even_release=be_release,
+        break_even_cost=be_cost,
+        payback_months=payback_months,
+        **curves,
+    )
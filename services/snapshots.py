@@ -0,0 +1,203 @@
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from services.calculations import SuiteAggregate, compute_cost_components, roi_from_components
+
+AGGREGATE_COLUMNS = tuple(f.name for f in fields(SuiteAggregate))
+
+# Everything a trend query returns, one row per snapshot
+SNAPSHOT_COLUMNS = (
+    "id", "suite", "taken_at", "dataset_id", "tester_dataset_id",
+    "runs_per_release", "releases", "releases_per_year",
+    "manual_rate", "automation_rate",
+    "manual_cost_per_release", "automation_initial_cost", "automation_run_cost_per_release",
+    "maintenance_pct", "total_runs",
+    "break_even_release", "break_even_cost", "final_roi",
+) + AGGREGATE_COLUMNS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    dataset_id TEXT,
+    tester_dataset_id TEXT,
+    runs_per_release INTEGER NOT NULL,
+    releases INTEGER NOT NULL,
+    releases_per_year REAL NOT NULL,
+    manual_rate REAL,
+    automation_rate REAL,
+    manual_cost_per_release REAL,
+    automation_initial_cost REAL,
+    automation_run_cost_per_release REAL,
+    maintenance_pct REAL,
+    total_runs INTEGER,
+    break_even_release REAL,
+    break_even_cost REAL,
+    final_roi REAL,
+    {", ".join(f"{c} REAL NOT NULL" for c in AGGREGATE_COLUMNS)}
+);
+-- Trend queries are a range scan over one suite's timestamps
+CREATE INDEX IF NOT EXISTS snapshots_suite_taken_at ON snapshots (suite, taken_at);
+CREATE INDEX IF NOT EXISTS snapshots_dataset_id ON snapshots (dataset_id);
+CREATE TABLE IF NOT EXISTS roi_points (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    release INTEGER NOT NULL,
+    manual_cost REAL,
+    automation_cost REAL,
+    roi REAL,
+    PRIMARY KEY (snapshot_id, release)
+) WITHOUT ROWID;
+"""
+
+
+def _real(value) -> Optional[float]:
+    # SQLite has no NaN, it would come back as NULL anyway
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+class SnapshotStore:
+    """
+    ROI history per suite in a local SQLite file, no server needed.
+
+    Each snapshot keeps the suite's SuiteAggregate totals, the rates and
+    parameters it was evaluated with, the cost components and break-even,
+    and the roi_over_time curve. Trend queries read one row per snapshot
+    through the (suite, taken_at) index, never the test-case rows or the
+    curves, so they stay fast over thousands of snapshots.
+
+    Each thread keeps its own connection and the file is in WAL mode, so
+    any number of threads and worker processes can share it. The file is
+    created on first use.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            # In WAL mode this only gives up durability on power loss, not consistency
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def save(
+        self,
+        suite: str,
+        aggregate: SuiteAggregate,
+        rates: Dict[str, float],
+        runs_per_release: int = 1,
+        releases: int = 12,
+        releases_per_year: float = 12.0,
+        dataset_id: Optional[str] = None,
+        tester_dataset_id: Optional[str] = None,
+        taken_at: Optional[float] = None,
+    ) -> int:
+        """
+        Evaluates the ROI model on aggregate and stores it as a snapshot of
+        suite taken at taken_at (Unix seconds, now by default). Returns its id.
+        """
+        components = compute_cost_components(aggregate, rates, runs_per_release)
+        roi_df, break_even_release, break_even_cost = roi_from_components(components, releases, releases_per_year)
+        row = {
+            "suite": suite,
+            "taken_at": time.time() if taken_at is None else taken_at,
+            "dataset_id": dataset_id,
+            "tester_dataset_id": tester_dataset_id,
+            "runs_per_release": runs_per_release,
+            "releases": releases,
+            "releases_per_year": releases_per_year,
+            "manual_rate": _real(rates["manual_rate"]),
+            "automation_rate": _real(rates["automation_rate"]),
+            "manual_cost_per_release": _real(components[0]),
+            "automation_initial_cost": _real(components[1]),
+            "automation_run_cost_per_release": _real(components[2]),
+            "maintenance_pct": _real(components[3]),
+            "total_runs": components[4],
+            "break_even_release": _real(break_even_release),
+            "break_even_cost": _real(break_even_cost),
+            "final_roi": _real(roi_df["roi"].iloc[-1]) if len(roi_df) else None,
+            **{c: getattr(aggregate, c) for c in AGGREGATE_COLUMNS},
+        }
+        # NaN costs (no candidates to maintain) are bound as NULL
+        points = roi_df[["release", "manual_cost", "automation_cost", "roi"]]
+
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                f"INSERT INTO snapshots ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
+            )
+            snapshot_id = cursor.lastrowid
+            connection.executemany(
+                "INSERT INTO roi_points VALUES (?, ?, ?, ?, ?)",
+                ((snapshot_id, int(r), m, a, roi) for r, m, a, roi in points.itertuples(index=False)),
+            )
+        return snapshot_id
+
+    def trend(
+        self,
+        suite: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        The suite's snapshots taken in [since, until], oldest first. With
+        limit, only the most recent `limit` of them.
+        """
+        where, params = ["suite = ?"], [suite]
+        if since is not None:
+            where.append("taken_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("taken_at <= ?")
+            params.append(until)
+        query = f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM snapshots WHERE {' AND '.join(where)} ORDER BY taken_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        rows = self._connection().execute(query, params).fetchall()
+        trend = pd.DataFrame.from_records(rows[::-1], columns=list(SNAPSHOT_COLUMNS))
+        trend["taken_at"] = pd.to_datetime(trend["taken_at"], unit="s", utc=True)
+        # NULLs (no break-even, ...) come back as None, keep the columns numeric
+        numeric = list(SNAPSHOT_COLUMNS[SNAPSHOT_COLUMNS.index("runs_per_release"):])
+        trend[numeric] = trend[numeric].astype(float)
+        return trend
+
+    def roi_curve(self, snapshot_id: int) -> pd.DataFrame:
+        rows = self._connection().execute(
+            "SELECT release, manual_cost, automation_cost, roi FROM roi_points"
+            " WHERE snapshot_id = ? ORDER BY release",
+            (snapshot_id,),
+        ).fetchall()
+        return pd.DataFrame.from_records(rows, columns=["release", "manual_cost", "automation_cost", "roi"])
+
+    def suite_of(self, dataset_id: str) -> Optional[str]:
+        # The suite an uploaded dataset was last saved under
+        row = self._connection().execute(
+            "SELECT suite FROM snapshots WHERE dataset_id = ? ORDER BY taken_at DESC LIMIT 1",
+            (dataset_id,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def suites(self) -> List[str]:
+        rows = self._connection().execute("SELECT DISTINCT suite FROM snapshots ORDER BY suite")
+        return [row[0] for row in rows]
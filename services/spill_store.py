@@ -0,0 +1,165 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger("qalculator.datasets")
+
+SUFFIX = ".arrow"
+
+# Temp files older than this were left behind by a worker that died mid-write
+STALE_TEMP_SECONDS = 3600
+
+
+class SpillStore:
+    """
+    Parsed datasets on local disk, shared by every worker process.
+
+    Each frame is written once, as an uncompressed Arrow IPC file named after
+    its dataset ID (a content hash). Readers memory-map the file, so workers
+    share the page cache instead of each holding a parsed copy, and numeric
+    columns without nulls become pandas columns without a copy. Frames read
+    back are read-only.
+
+    Writes go to a temp file that is renamed into place, so readers only ever
+    see complete files. Reading a file bumps its mtime, and every write evicts
+    the least recently used files while the directory is over max_bytes or
+    max_entries. Evicting a file another worker has mapped is safe: the
+    mapping stays valid until that worker drops the frame.
+
+    Needs pyarrow.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 4 * 1024 ** 3, max_entries: int = 256):
+        import pyarrow  # noqa: F401  fail at startup rather than on the first upload
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def path(self, dataset_id: str) -> Path:
+        if not dataset_id or os.sep in dataset_id or dataset_id.startswith("."):
+            raise ValueError(f"Invalid dataset ID {dataset_id!r}")
+        return self.directory / f"{dataset_id}{SUFFIX}"
+
+    def put(self, dataset_id: str, frame: pd.DataFrame) -> bool:
+        """
+        Writes frame unless another worker already has. Returns False when the
+        frame can't be stored as Arrow (e.g. mixed-type object columns), it
+        then only lives in the calling worker's memory.
+        """
+        import pyarrow as pa
+
+        path = self.path(dataset_id)
+        if path.exists():
+            self._touch(path)
+            return True
+        try:
+            table = pa.Table.from_pandas(frame)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.warning("Not spilling dataset %s: %s", dataset_id, e)
+            return False
+
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, prefix=f".{dataset_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.writes += 1
+        self.evict(keep=path)
+        return True
+
+    def get(self, dataset_id: Optional[str]) -> Optional[pd.DataFrame]:
+        import pyarrow as pa
+
+        if not dataset_id:
+            return None
+        path = self.path(dataset_id)
+        try:
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._touch(path)
+        with self._lock:
+            self.hits += 1
+        # split_blocks keeps each column its own block, so none are consolidated (copied)
+        return table.to_pandas(split_blocks=True)
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return self.path(dataset_id).exists()
+
+    def evict(self, keep: Optional[Path] = None) -> List[str]:
+        """
+        Deletes least recently used files until the directory is within its
+        limits, never `keep`. Returns the evicted dataset IDs.
+        """
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        count, total = len(entries), sum(size for _, _, size in entries)
+        evicted = []
+        for path, _, size in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # Another worker may have evicted it first
+            path.unlink(missing_ok=True)
+            count -= 1
+            total -= size
+            evicted.append(path.name[:-len(SUFFIX)])
+
+        now = time.time()
+        for temp in self.directory.glob(".*.tmp"):
+            try:
+                if now - temp.stat().st_mtime > STALE_TEMP_SECONDS:
+                    temp.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "bytes": sum(size for _, _, size in entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+            }
+
+    def _entries(self) -> List[Tuple[Path, float, int]]:
+        entries = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # mtime is the LRU clock, atime is often disabled (noatime)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
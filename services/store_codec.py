@@ -0,0 +1,141 @@
+import abc
+import base64
+import io
+import json
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from services.dataset_cache import content_hash
+
+# What active-df-store / active-tester-df-store hold:
+#   None                                   the example data
+#   "<dataset id>"                         the frame is in the server-side cache (default)
+#   {"id": ..., "codec": ..., "data": ...} the frame itself travels too, see inline_store
+
+
+class StoreCodec(abc.ABC):
+    """
+    Encodes a frame into a JSON-safe dcc.Store value and back, keeping its
+    dtypes (including categories and float32). The name is stored alongside
+    the data, so any worker can decode a payload whatever codec it runs with.
+    """
+    name = ""
+
+    @abc.abstractmethod
+    def encode(self, frame: pd.DataFrame) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def decode(self, data: Any) -> pd.DataFrame:
+        ...
+
+
+class ColumnarJsonCodec(StoreCodec):
+    """
+    One JSON list per column rather than to_dict("records"), which repeats
+    every column name on every row. Needs nothing beyond pandas.
+    """
+    name = "columns"
+
+    def encode(self, frame: pd.DataFrame) -> Dict[str, Any]:
+        return {
+            "dtypes": {column: str(dtype) for column, dtype in frame.dtypes.items()},
+            # pandas' own JSON writer turns NaN into null without boxing each value
+            "columns": {column: json.loads(frame[column].to_json(orient="values")) for column in frame.columns},
+        }
+
+    def decode(self, data: Dict[str, Any]) -> pd.DataFrame:
+        frame = pd.DataFrame(data["columns"], columns=list(data["dtypes"]))
+        return frame.astype(data["dtypes"])
+
+
+class ArrowCodec(StoreCodec):
+    """
+    A compressed Arrow IPC stream as base64 text. Numbers stay binary and
+    categories stay dictionary-encoded, the fastest to encode. Needs pyarrow.
+    """
+    name = "arrow"
+
+    def __init__(self, compression: str = "zstd"):
+        import pyarrow  # noqa: F401  fail at startup rather than on the first upload
+
+        self.compression = compression
+
+    def encode(self, frame: pd.DataFrame) -> str:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+    def decode(self, data: str) -> pd.DataFrame:
+        import pyarrow as pa
+
+        table = pa.ipc.open_stream(pa.py_buffer(base64.b64decode(data))).read_all()
+        return table.to_pandas(split_blocks=True)
+
+
+class ParquetCodec(StoreCodec):
+    """
+    A compressed Parquet file as base64 text. Parquet's encodings make it
+    the smallest for large frames, small ones pay for its metadata. Needs
+    pyarrow.
+    """
+    name = "parquet"
+
+    def __init__(self, compression: str = "zstd"):
+        import pyarrow  # noqa: F401
+
+        self.compression = compression
+
+    def encode(self, frame: pd.DataFrame) -> str:
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, engine="pyarrow", compression=self.compression, index=False)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    def decode(self, data: str) -> pd.DataFrame:
+        return pd.read_parquet(io.BytesIO(base64.b64decode(data)), engine="pyarrow")
+
+
+CODECS = {codec.name: codec for codec in (ColumnarJsonCodec, ArrowCodec, ParquetCodec)}
+
+
+def get_codec(name: str) -> StoreCodec:
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown store codec {name!r}, expected one of {', '.join(CODECS)}") from None
+
+
+def inline_store(frame: pd.DataFrame, codec: StoreCodec) -> Dict[str, Any]:
+    # The ID is the payload's hash, so a worker that didn't encode it can verify it
+    store = {"codec": codec.name, "data": codec.encode(frame)}
+    return {"id": inline_dataset_id(store), **store}
+
+
+def store_dataset_id(store: Any) -> Optional[str]:
+    if isinstance(store, dict):
+        return store.get("id")
+    return store
+
+
+def inline_dataset_id(store: Dict[str, Any]) -> str:
+    # The hash of an inline store's payload, the same before and after its
+    # JSON round trip through the browser
+    data = store["data"]
+    payload = data if isinstance(data, str) else json.dumps(data, sort_keys=True)
+    return content_hash(f"{store.get('codec')}:{payload}")
+
+
+def decode_store(store: Any) -> Optional[pd.DataFrame]:
+    # The frame carried by an inline store value, None for plain dataset IDs
+    if not isinstance(store, dict) or "data" not in store:
+        return None
+    codec = CODECS.get(store.get("codec"))
+    if codec is None:
+        raise ValueError(f"Unknown store codec {store.get('codec')!r}")
+    return codec().decode(store["data"])
@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Operators of the DataTable filter query syntax, longest match first
+FILTER_OPERATORS = (
+    ("ge ", ">="),
+    ("le ", "<="),
+    ("lt ", "<"),
+    ("gt ", ">"),
+    ("ne ", "!="),
+    ("eq ", "="),
+    ("contains ",),
+    ("datestartswith ",),
+)
+
+COMPARISONS = ("ge", "le", "lt", "gt", "ne", "eq")
+
+
+def split_filter_part(filter_part: str) -> Tuple[Optional[str], Optional[str], Any]:
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator not in filter_part:
+                continue
+            name_part, value_part = filter_part.split(operator, 1)
+            name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+
+            operator_name = operator_type[0].strip()
+            value_part = value_part.strip()
+            v0 = value_part[:1]
+            if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                value = value_part[1:-1].replace("\\" + v0, v0)
+            elif operator_name in COMPARISONS:
+                try:
+                    value = float(value_part)
+                except ValueError:
+                    value = value_part
+            else:
+                # text operators keep the value as typed, "contains 99" is not "99.0"
+                value = value_part
+
+            return name, operator_name, value
+    return None, None, None
+
+
+def filter_frame(data_frame: pd.DataFrame, filter_query: Optional[str]) -> pd.DataFrame:
+    if not filter_query:
+        return data_frame
+
+    mask = np.ones(len(data_frame), dtype=bool)
+    for filter_part in filter_query.split(" && "):
+        column, operator, value = split_filter_part(filter_part)
+        if column not in data_frame.columns:
+            continue
+        series = data_frame[column]
+        try:
+            if operator in COMPARISONS:
+                part = getattr(series, operator)(value)
+            elif operator == "contains":
+                part = series.astype(str).str.contains(str(value), regex=False)
+            elif operator == "datestartswith":
+                part = series.astype(str).str.startswith(str(value))
+            else:
+                continue
+        except TypeError:
+            # e.g. comparing a numeric column with text, nothing can match
+            part = np.zeros(len(data_frame), dtype=bool)
+        mask &= np.asarray(part, dtype=bool)
+    return data_frame[mask]
+
+
+def sort_frame(data_frame: pd.DataFrame, sort_by: Optional[List[Dict[str, str]]]) -> pd.DataFrame:
+    sort_by = [s for s in (sort_by or []) if s.get("column_id") in data_frame.columns]
+    if not sort_by:
+        return data_frame
+    return data_frame.sort_values(
+        [s["column_id"] for s in sort_by],
+        ascending=[s["direction"] == "asc" for s in sort_by],
+        kind="stable",
+    )
+
+
+def page_records(page: pd.DataFrame) -> List[Dict[str, Any]]:
+    # Compacted float32 columns would serialise as 0.10000000149..., go through
+    # their shortest decimal repr so the table shows what was uploaded.
+    page = page.copy()
+    for column in page.columns:
+        if page[column].dtype == np.float32:
+            page[column] = pd.to_numeric(page[column].astype(str), errors="coerce")
+    return page.to_dict("records")
+
+
+def table_page(
+    data_frame: pd.DataFrame,
+    columns: Sequence[str],
+    page_current: int = 0,
+    page_size: int = 10,
+    sort_by: Optional[List[Dict[str, str]]] = None,
+    filter_query: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Filters, sorts and slices data_frame for a DataTable in custom paging mode,
+    returns the visible rows and the page count.
+    """
+    df = filter_frame(data_frame, filter_query)
+    df = sort_frame(df, sort_by)
+    page_current = page_current or 0
+    page_count = max(1, -(-len(df) // page_size))
+    page = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    return page_records(page[[c for c in columns if c in page.columns]]), page_count
@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from data import CsvSchema
+from services.calculations import normalised_labels
+
+MAX_EXAMPLES = 20
+
+Range = Tuple[Optional[float], Optional[float]]
+
+
+@dataclass(frozen=True)
+class ValidationReport:
+    """
+    What validate_frame found: how many rows each problem affects, and the
+    first offending values as examples. row is the 1-based data row, row 1
+    being the first line after a CSV's header.
+    """
+    rows: int
+    invalid_rows: int
+    counts: Dict[str, int]
+    examples: pd.DataFrame
+
+    @property
+    def ok(self) -> bool:
+        return self.invalid_rows == 0
+
+    def summary(self) -> str:
+        if self.ok:
+            return f"All {self.rows} rows are valid."
+        problems = "; ".join(f"{problem} ({n} row{'' if n == 1 else 's'})" for problem, n in self.counts.items())
+        return f"{self.invalid_rows} of {self.rows} rows have invalid values: {problems}."
+
+    def merge(self, other: "ValidationReport", max_examples: int = MAX_EXAMPLES) -> "ValidationReport":
+        # The report of this chunk followed by other, other's rows numbered on from this one's
+        counts = dict(self.counts)
+        for problem, n in other.counts.items():
+            counts[problem] = counts.get(problem, 0) + n
+        examples = self.examples
+        if len(examples) < max_examples and len(other.examples):
+            shifted = other.examples.assign(row=other.examples["row"] + self.rows)
+            parts = [examples, shifted] if len(examples) else [shifted]
+            examples = pd.concat(parts, ignore_index=True).head(max_examples)
+        return ValidationReport(
+            rows=self.rows + other.rows,
+            invalid_rows=self.invalid_rows + other.invalid_rows,
+            counts=counts,
+            examples=examples,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "invalid_rows": self.invalid_rows,
+            "counts": self.counts,
+            "examples": self.examples.to_dict("records"),
+        }
+
+
+def _range_problem(low: Optional[float], high: Optional[float]) -> str:
+    if high is None:
+        return f"must be >= {low:g}"
+    if low is None:
+        return f"must be <= {high:g}"
+    return f"must be between {low:g} and {high:g}"
+
+
+def _parse_numbers(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses a text column as float64 and flags the cells that aren't numbers.
+    Each distinct string is parsed once: exports repeat a few values many
+    times, and parsing is what costs, not mapping the results back.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce")
+    numbers = parsed.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Whitespace-only cells are blanks, not text
+    blank = pd.Series(uniques, dtype=object).astype(str).str.strip().to_numpy() == ""
+    is_text = np.append(np.isnan(numbers) & ~blank, False)
+    # code -1 is missing, which indexes the trailing NaN / False
+    return np.append(numbers, np.nan)[codes], is_text[codes]
+
+
+def validate_frame(
+    data_frame: pd.DataFrame,
+    dtypes: Mapping[str, Any],
+    value_ranges: Optional[Mapping[str, Range]] = None,
+    allowed_labels: Optional[Mapping[str, Sequence[str]]] = None,
+    required: Sequence[str] = (),
+    max_examples: int = MAX_EXAMPLES,
+) -> Tuple[pd.DataFrame, ValidationReport]:
+    """
+    Coerces every declared numeric column to float64 and checks each column
+    with whole-column operations, no per-row Python.
+
+    Text in numeric columns, values outside value_ranges and labels not in
+    allowed_labels (compared normalised, blanks allowed) become NaN, so the
+    calculations treat them like blanks. Missing required values are only
+    reported. Returns the coerced frame, a shallow copy: data_frame itself
+    is left alone.
+    """
+    df = data_frame.copy(deep=False)
+    value_ranges = value_ranges or {}
+    allowed_labels = allowed_labels or {}
+    invalid = np.zeros(len(df), dtype=bool)
+    found: List[Tuple[str, str, np.ndarray, pd.Series]] = []
+
+    def flag(column: str, problem: str, mask: np.ndarray, values: pd.Series) -> bool:
+        nonlocal invalid
+        if not mask.any():
+            return False
+        found.append((column, problem, mask, values))
+        invalid |= mask
+        return True
+
+    for column, dtype in dtypes.items():
+        if column not in df.columns or dtype is str:
+            continue
+        values = df[column]
+        if is_numeric_dtype(values.dtype):
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            # Only files that failed the typed read get here, see services.ingest.read_table
+            numbers, text = _parse_numbers(values)
+            flag(column, "not a number", text, values)
+        bad = np.isinf(numbers)
+        flag(column, "not a finite number", bad, values)
+
+        low, high = value_ranges.get(column, (None, None))
+        with np.errstate(invalid="ignore"):
+            out_of_range = np.zeros(len(df), dtype=bool)
+            if low is not None:
+                out_of_range |= numbers < low
+            if high is not None:
+                out_of_range |= numbers > high
+        if flag(column, _range_problem(low, high), out_of_range & ~bad, values):
+            bad |= out_of_range
+        if bad.any():
+            numbers = np.where(bad, np.nan, numbers)
+        df[column] = numbers
+
+    for column, allowed in allowed_labels.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        # Checked once per distinct label, then mapped back to the rows
+        labels, codes = normalised_labels(values)
+        unknown = ~labels.isin(list(allowed) + ["nan", ""])
+        bad = unknown[codes]
+        if flag(column, f"not one of {', '.join(allowed)}", bad, values):
+            df[column] = values.where(~bad)
+
+    for column in required:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        missing = values.isna().to_numpy() | (values.astype(object) == "").to_numpy()
+        flag(column, "missing", missing, values)
+
+    return df, _report(len(df), invalid, found, max_examples)
+
+
+def _report(rows: int, invalid: np.ndarray, found, max_examples: int) -> ValidationReport:
+    counts = {f"{column}: {problem}": int(mask.sum()) for column, problem, mask, _ in found}
+    parts = []
+    for column, problem, mask, values in found:
+        # The first max_examples of each problem are enough to pick the overall first ones
+        positions = np.flatnonzero(mask)[:max_examples]
+        parts.append(pd.DataFrame({
+            "row": positions + 1,
+            "column": column,
+            "value": values.iloc[positions].astype(str).to_numpy(),
+            "problem": problem,
+        }))
+    if parts:
+        examples = pd.concat(parts, ignore_index=True).sort_values(["row", "column"], kind="stable")
+        examples = examples.head(max_examples).reset_index(drop=True)
+    else:
+        examples = pd.DataFrame(columns=["row", "column", "value", "problem"])
+    return ValidationReport(rows=rows, invalid_rows=int(invalid.sum()), counts=counts, examples=examples)
+
+
+def validate_test_cases(data_frame: pd.DataFrame, max_examples: int = MAX_EXAMPLES):
+    return validate_frame(data_frame, CsvSchema.dtypes, CsvSchema.value_ranges, CsvSchema.allowed_labels,
+                          CsvSchema.required, max_examples)
+
+
+def validate_testers(data_frame: pd.DataFrame, max_examples: int = MAX_EXAMPLES):
+    return validate_frame(data_frame, CsvSchema.tester_dtypes, CsvSchema.tester_value_ranges,
+                          CsvSchema.tester_allowed_labels, CsvSchema.tester_required, max_examples)
@@ -1,43 +1,97 @@
-import base64, io, datetime as dt
-from typing import Tuple
+import datetime as dt
+from typing import Callable, Dict, Optional, Tuple
 import pandas as pd
 from dash import html, dash_table
 from data import CsvSchema
+from services.ingest import decode_upload, read_table, validate_columns
+from services.table_pages import table_page
+from services.validation import ValidationReport
+
+Validator = Callable[[pd.DataFrame], Tuple[pd.DataFrame, ValidationReport]]
+
+
+def preview_table(table_id: str, df: pd.DataFrame, columns: Tuple[str, ...], page_size: int = 10):
+    # Custom paging/sorting/filtering: only the first page is sent here, the
+    # rest is served from the server-side frame by the table's page callback.
+    data, page_count = table_page(df, columns, page_size=page_size)
+    return dash_table.DataTable(
+        id=table_id,
+        data=data,
+        columns=[{"name": c, "id": c} for c in columns if c in df.columns],
+        page_current=0,
+        page_size=page_size,
+        page_count=page_count,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        style_table={"overflowX": "auto"},
+    )
+
+
+def validation_summary(report: Optional[ValidationReport]):
+    # Nothing for clean files, otherwise the counts and the first offending rows
+    if report is None or report.ok:
+        return None
+    examples = report.examples
+    return html.Div([
+        html.P(f"{report.summary()} They are ignored, like blank cells.", style={"color": "darkorange"}),
+        dash_table.DataTable(
+            data=examples.to_dict("records"),
+            columns=[{"name": c, "id": c} for c in examples.columns],
+            style_table={"overflowX": "auto"},
+        ),
+    ])
+
 
 class UploadParser:
-    def __init__(self, columns: Tuple[str, ...]):
+    def __init__(
+        self,
+        columns: Tuple[str, ...],
+        dtypes: Optional[Dict] = None,
+        table_id: str = "preview-table",
+        validator: Optional[Validator] = None,
+    ):
         self.columns = columns
+        self.dtypes = dtypes
+        self.table_id = table_id
+        self.validator = validator
 
     def parse_contents(self, contents: str, filename: str, last_modified: int):
+        df, report = self.read_validated(contents, filename)
+        return self.render_preview(df, filename, last_modified, report), df
+
+    def read_contents(self, contents: str, filename: str) -> pd.DataFrame:
+        return self.read_validated(contents, filename)[0]
+
+    def read_validated(self, contents: str, filename: str) -> Tuple[pd.DataFrame, Optional[ValidationReport]]:
+        # The report is None without a validator
         df = self._to_dataframe(contents, filename)
         self._validate_schema(df)
-        return self._render_preview(df, filename, last_modified), df
+        if self.validator is None:
+            return df, None
+        return self.validator(df)
 
-    def _to_dataframe(self, contents: str, filename: str) -> pd.DataFrame:
-        content_type, content_string = contents.split(",", 1)
-        decoded = base64.b64decode(content_string)
+    def render_preview(
+        self, df: pd.DataFrame, filename: str, last_modified: int, report: Optional[ValidationReport] = None
+    ):
+        table = preview_table(self.table_id, df, self.columns)
+        return self._preview_layout(filename, last_modified, table, validation_summary(report))
 
-        fn = filename.lower()
-        if fn.endswith(".csv"):
-            return pd.read_csv(io.StringIO(decoded.decode("utf-8")))
-        if fn.endswith((".xls", ".xlsx")):
-            return pd.read_excel(io.BytesIO(decoded))
-        raise ValueError("Unsupported file type. Please upload .csv or .xlsx")
+    def _to_dataframe(self, contents: str, filename: str) -> pd.DataFrame:
+        # Columnar formats only read the schema's columns
+        return read_table(decode_upload(contents), filename, self.dtypes, self.columns)
 
     def _validate_schema(self, df: pd.DataFrame) -> None:
-        missing = [c for c in self.columns if c not in df.columns]
-        if missing:
-            raise ValueError(f"Columns does not match the example.csv: {missing}")
+        validate_columns(df, self.columns)
 
-    def _render_preview(self, df: pd.DataFrame, filename: str, last_modified: int):
+    def _preview_layout(self, filename: str, last_modified: int, table, summary=None):
         return html.Div([
             html.H5(filename),
             html.H6(dt.datetime.fromtimestamp(last_modified)),
-            dash_table.DataTable(
-                data=df.to_dict("records"),
-                columns=[{"name": c, "id": c} for c in df.columns],
-                page_size=10,
-                style_table={"overflowX": "auto"},
-            ),
+            summary,
+            table,
             html.Hr(),
         ])